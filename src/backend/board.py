@@ -1,45 +1,127 @@
+import logging
 import random
 from collections.abc import Generator
 from typing import Any
 
-from src.backend import utils
+from src.backend import movegen, utils, zobrist
 from src.backend.move import Move
 from src.backend.piece import Piece
 from src.backend.piece_container import PieceContainer
-from src.typings import BoardList, Colour, Column, FenChar, PieceName
+from src.backend.undo_info import UndoInfo
+from src.typings import BoardList, Colour, Column, PieceName, PositionKey, RawMove
+
+
+logger = logging.getLogger(__name__)
+
+# Whether the side to move has a legal move, by Zobrist hash (see `Board.has_legal_move`).
+_HAS_LEGAL_MOVE_CACHE: dict[int, bool] = {}
+_HAS_LEGAL_MOVE_CACHE_SIZE = 2**16
+# Maps the lowercase piece name to the name of the Board attribute holding that piece type's bitboard.
+_BITBOARD_FOR_PIECE_TYPE: dict[str, str] = {
+    "p": "pawns",
+    "n": "knights",
+    "b": "bishops",
+    "r": "rooks",
+    "q": "queens",
+    "k": "kings",
+}
+# How an empty square is shown by `Board.__str__`, padded to the same width as a piece (e.g. "Pa2").
+_EMPTY_DISPLAY_CELL = "   "
+# The colours in the order the random board places their pieces.
+_COLOURS: tuple[Colour, Colour] = ("WHITE", "BLACK")
+# Maps the FEN's active colour to the turn.
+_TURN_FOR_FEN_TURN: dict[str, Colour] = {"w": "WHITE", "b": "BLACK"}
+# It's more likely to have fewer than more of the same piece on a random board,
+# so we use decreasing weights on occurences (with exception of no occurence).
+_WEIGHTS_FOR_PAWNS = (5, 15, 45, 25, 5, 2, 1.5, 1, 0.5)
+_WEIGHTS_FOR_QUEENS = (35, 45, 10, 5, 2, 1.25, 0.875, 0.5, 0.25, 0.125)
+_WEIGHTS_FOR_ROOKS_KNIGHTS_BISHOPS = (10, 35, 35, 10, 5, 2, 1.25, 0.875, 0.5, 0.25, 0.125)
+# Maps the byte of each valid FEN piece letter to its PieceName.
+_PIECE_NAME_FOR_BYTE: dict[int, PieceName] = {ord(piece_name): piece_name for piece_name in "pnbrqkPNBRQK"}  # type: ignore
+# Maps empty squares (0 in `Board._symbols`) to b"1" so runs of them can be collapsed into FEN digits.
+_EMPTY_SQUARE_TRANSLATION = bytes.maketrans(b"\x00", b"1")
+# Runs of 8 down to 2 empty squares and their FEN digit, longest first so shorter runs can't split a longer one.
+_EMPTY_SQUARE_RUNS: tuple[tuple[bytes, bytes], ...] = tuple(
+    (b"1" * num_empty_squares, str(num_empty_squares).encode()) for num_empty_squares in range(8, 1, -1)
+)
 
 
 class Board:
+    # Bitboards, where bit `row_indx * 8 + col_indx` is set if the square holds a matching piece.
+    bishops: int = 0
+    black: int = 0
+    kings: int = 0
+    knights: int = 0
+    occupied: int = 0
+    pawns: int = 0
+    queens: int = 0
+    rooks: int = 0
+    white: int = 0
+
     black_pieces: PieceContainer
     fen: str
     halfmove_clock: int = 0
     fullmove_number: int = 1
     prev_move: Move | None = None
-    squares: BoardList
     turn: Colour
     white_pieces: PieceContainer
+    # How each square is shown by `__str__`, indexed the same as `_piece_at`.
+    _display_cells: list[str]
+    # NB: The FEN cache must be reset by anything that changes the position, see `_set_piece_at` and `make`.
+    _fen_cache: str | None = None
+    _piece_at: list[Piece | None]
+    # NB: Like the FEN cache, this must be reset whenever a piece container changes (see `make`).
+    _pieces_cache: list[Piece] | None = None
+    _position_key: PositionKey
+    # The ASCII piece name on each square (0 if empty), indexed the same as `_piece_at`.
+    _symbols: bytearray
+    # The Zobrist hash of just the piece placement, kept in sync by `_set_piece_at` (see `zobrist_hash`).
+    _zobrist: int = 0
 
     def __init__(self, board_fen: str | None = None) -> None:
+        self._clear_squares()
         if board_fen:
             # NB: Turn is determined by FEN in _generate_board_from_fen
             self._generate_board_from_fen(board_fen)
             self.fen = board_fen
         else:
-            self.turn = random.choice(["WHITE", "BLACK"])
+            self.turn = random.choice(_COLOURS)
             self.fen = self._generate_random_board()
             print(f"Generated board: {self.fen}\n{self}\n")
 
-    def __str__(self) -> str:
-        board_as_str: str = ""
-        for row in self.squares[::-1]:  # Reverse the board so that a1 is at the bottom left, not top left.
-            board_as_str += " | ".join(str(col) if col else "   " for col in row)
-            board_as_str += "\n"
+    def __deepcopy__(self, memo: dict[int, Any]) -> "Board":
+        # Pieces and moves are never changed once created (moving a piece creates a new Piece), so the copy can
+        # share them. Only the lists and containers that `make` changes in place need copying.
+        new_board = Board.__new__(Board)
+        new_board.__dict__.update(self.__dict__)
+        new_board.black_pieces = PieceContainer(
+            self.black_pieces.all.copy(), self.black_pieces.king, self.black_pieces.rooks.copy()
+        )
+        new_board.white_pieces = PieceContainer(
+            self.white_pieces.all.copy(), self.white_pieces.king, self.white_pieces.rooks.copy()
+        )
+        new_board._display_cells = self._display_cells.copy()
+        new_board._piece_at = self._piece_at.copy()
+        new_board._symbols = self._symbols.copy()
+        return new_board
 
-        return board_as_str
+    def __str__(self) -> str:
+        display_cells = self._display_cells
+        return "".join(
+            # Go backwards so that a1 is at the bottom left, not top left.
+            " | ".join(display_cells[row_indx * 8 : row_indx * 8 + 8]) + "\n"
+            for row_indx in range(7, -1, -1)
+        )
+
+    def _clear_squares(self) -> None:
+        self._display_cells = [_EMPTY_DISPLAY_CELL] * 64
+        self._piece_at = [None] * 64
+        self._symbols = bytearray(64)
+        self.pawns = self.knights = self.bishops = self.rooks = self.queens = self.kings = 0
+        self.white = self.black = self.occupied = 0
+        self._zobrist = 0
 
     def _generate_board_from_fen(self, board_fen: str) -> None:
-        board: BoardList = []
-
         # Parse the board from the FEN
         board_fen_split = board_fen.split(" ")
         if len(board_fen_split) != 6:
@@ -57,27 +139,25 @@ class Board:
         black_king: Piece
         black_rooks: list[Piece] = []
 
-        for row_indx_offset, row in enumerate(board_fen_rows):
-            # FEN notation has 8th row first so we subtract index from 7
-            # so that first row from FEN has correct row index of 7, etc.
-            row_indx = 7 - row_indx_offset
-
-            board_row: list[Piece | None] = []
+        # FEN notation has 8th row first, so the rows are paired with descending row indexes.
+        # Each piece is written straight to its square, so there's no row list to assemble or reorder.
+        for row_indx, row in zip(range(7, -1, -1), board_fen_rows):
             col_indx: int = 0
 
-            for char in row:  # type: ignore -- Python thinks `char` can't be a FenChar
-                char: FenChar  # type: ignore -- Python doesn't like that we change type further down
-                if char.isdigit():
-                    num_empty_squares = int(char)
-                    board_row.extend([None] * num_empty_squares)
-                    col_indx += num_empty_squares
+            # The row is walked as bytes so that each character is a plain int compare rather than a str lookup.
+            # Non-ASCII characters are replaced (with "?") so they're reported as invalid below.
+            for byte in row.encode("ascii", "replace"):
+                if 49 <= byte <= 56:  # b"1" to b"8"
+                    col_indx += byte - 48
                     continue
 
-                # `char` isn't a number, so it has to be a PieceName.
-                # Unfortunately, Python doesn't automatically narrow this.
-                char: PieceName
+                piece_name = _PIECE_NAME_FOR_BYTE.get(byte)
+                if piece_name is None:
+                    raise ValueError(
+                        f"FEN piece placements must only contain pieces or 1-8, but got {chr(byte)!r}: {row!r}"
+                    )
 
-                piece = Piece(char, col_indx, row_indx)
+                piece = Piece(piece_name, col_indx, row_indx)
                 if piece.colour == "WHITE":
                     white_pieces.append(piece)
                     if piece.name == "R":
@@ -91,17 +171,13 @@ class Board:
                     elif piece.name == "k":
                         black_king = piece
 
-                board_row.append(piece)
+                self._set_piece_at(row_indx * 8 + col_indx, piece)
                 col_indx += 1
 
-            # FEN notation has 8th row first so we insert rather than append
-            # to ensure that 1st row is board[0] and 8th row is board[7]
-            if len(board_row) != 8:
+            if col_indx != 8:
                 raise ValueError(
-                    f"FEN rows must have 8 pieces but FEN row with index {row_indx} has {len(board_fen)}: {row!r}"
+                    f"FEN rows must have 8 pieces but FEN row with index {row_indx} has {col_indx}: {row!r}"
                 )
-            board.insert(0, board_row)
-        self.squares = board
 
         self.white_pieces = PieceContainer(white_pieces, white_king, white_rooks)
         self.black_pieces = PieceContainer(black_pieces, black_king, black_rooks)
@@ -110,9 +186,9 @@ class Board:
         turn, castling_rights, en_passant_square, halfmove_clock, fullmove_number = board_fen_split[1:]
 
         # Parse turn
-        if turn not in ("w", "b"):
+        if turn not in _TURN_FOR_FEN_TURN:
             raise ValueError(f"Turn must be 'w' for white or 'b' for black, but got {turn!r}")
-        self.turn = "WHITE" if turn == "w" else "BLACK"
+        self.turn = _TURN_FOR_FEN_TURN[turn]
 
         # Parse castling rights
         if castling_rights == "-":
@@ -126,28 +202,28 @@ class Board:
                 # White can't castle kingside, so update the kingside rook to not be able to castle.
                 # Note that we only look at h1 since if kingside rook isn't there then can_castle will
                 # be False anyway since the rook has moved from its start position.
-                kingside_rook = self.get_piece_at("h1")
+                kingside_rook = self._piece_at[utils.SQ_H1]
                 if kingside_rook:
                     kingside_rook.can_castle = False
             if "Q" not in castling_rights:
                 # White can't castle queenside, so update the queenside rook to not be able to castle.
                 # Note that we only look at a1 since if queenside rook isn't there then can_castle will
                 # be False anyway since the rook has moved from its start position.
-                queenside_rook = self.get_piece_at("a1")
+                queenside_rook = self._piece_at[utils.SQ_A1]
                 if queenside_rook:
                     queenside_rook.can_castle = False
             if "k" not in castling_rights:
                 # Black can't castle kingside, so update the kingside rook to not be able to castle.
                 # Note that we only look at h8 since if kingside rook isn't there then can_castle will
                 # be False anyway since the rook has moved from its start position.
-                kingside_rook = self.get_piece_at("h8")
+                kingside_rook = self._piece_at[utils.SQ_H8]
                 if kingside_rook:
                     kingside_rook.can_castle = False
             if "q" not in castling_rights:
                 # Black can't castle queenside, so update the queenside rook to not be able to castle.
                 # Note that we only look at a8 since if queenside rook isn't there then can_castle will
                 # be False anyway since the rook has moved from its start position.
-                queenside_rook = self.get_piece_at("a8")
+                queenside_rook = self._piece_at[utils.SQ_A8]
                 if queenside_rook:
                     queenside_rook.can_castle = False
 
@@ -160,7 +236,7 @@ class Board:
             col_letter: Column = en_passant_square[0]  #  type: ignore
             pawn_col_indx = utils.letter_to_column_index(col_letter)
 
-            pawn_after = board[pawn_row_indx_after][pawn_col_indx]
+            pawn_after = self._piece_at[pawn_row_indx_after * 8 + pawn_col_indx]
             if pawn_after is None:
                 raise ValueError(
                     f"FEN en passant target square {en_passant_square!r} is not valid since there is no pawn at the would-be new pawn location."
@@ -187,69 +263,58 @@ class Board:
         self.halfmove_clock = int(halfmove_clock)
         self.fullmove_number = int(fullmove_number)
 
-    def _generate_fen(self) -> str:
-        fen: str = ""
-
-        # Add pieces to FEN
-        for row_count, row in enumerate(self.squares[::-1], start=1):
-            empty_squares = 0
-            for piece in row:
-                if piece is None:
-                    empty_squares += 1
-                else:
-                    if empty_squares:
-                        fen += str(empty_squares)
-                        empty_squares = 0
-                    fen += piece.name
-
-            if empty_squares:
-                fen += str(empty_squares)
-            if row_count < 8:
-                fen += "/"
-
-        # Add turn to FEN
-        fen += f" {self.turn[0].lower()} "
-
-        # Add castling rights to FEN
+    def _castling_rights(self) -> str:
+        castling_rights_parts: list[str] = []
         if self.white_pieces.king.can_castle:
-            kingside_rook = self.get_piece_at("h1")
+            kingside_rook = self._piece_at[utils.SQ_H1]
             if kingside_rook and kingside_rook.can_castle:
-                fen += "K"
-            queenside_rook = self.get_piece_at("a1")
+                castling_rights_parts.append("K")
+            queenside_rook = self._piece_at[utils.SQ_A1]
             if queenside_rook and queenside_rook.can_castle:
-                fen += "Q"
+                castling_rights_parts.append("Q")
         if self.black_pieces.king.can_castle:
-            kingside_rook = self.get_piece_at("h8")
+            kingside_rook = self._piece_at[utils.SQ_H8]
             if kingside_rook and kingside_rook.can_castle:
-                fen += "k"
-            queenside_rook = self.get_piece_at("a8")
+                castling_rights_parts.append("k")
+            queenside_rook = self._piece_at[utils.SQ_A8]
             if queenside_rook and queenside_rook.can_castle:
-                fen += "q"
+                castling_rights_parts.append("q")
+        return "".join(castling_rights_parts)
+
+    def _generate_fen(self) -> str:
+        if self._fen_cache is not None:
+            return self._fen_cache
+
+        # Add pieces to FEN. The rows are joined from the 8th row down with "/" so that no run of empty squares
+        # can span two rows, and then each run is replaced by its length at C speed rather than square by square.
+        symbols = self._symbols
+        piece_placement = b"/".join(symbols[row_indx * 8 : row_indx * 8 + 8] for row_indx in range(7, -1, -1))
+        piece_placement = piece_placement.translate(_EMPTY_SQUARE_TRANSLATION)
+        for empty_squares, digit in _EMPTY_SQUARE_RUNS:
+            piece_placement = piece_placement.replace(empty_squares, digit)
+
+        # Add turn to FEN
+        turn = self.turn[0].lower()
+
+        # Add castling rights to FEN
+        castling_rights = self._castling_rights()
 
         # Add en passant square to FEN (if applicable)
-        if self.prev_move and self.prev_move.en_passant_square:
-            col_indx, row_indx = self.prev_move.en_passant_square
-            fen += f" {utils.column_index_to_letter(col_indx)}{row_indx + 1} "
+        if self.prev_move and (ep_square := self.prev_move._ep_square) != -1:
+            en_passant_square = f"{utils.column_index_to_letter(ep_square & 7)}{(ep_square >> 3) + 1}"
         else:
-            fen += " - "
+            en_passant_square = "-"
 
-        # Add halfmove clock and fullmove number to FEN
-        fen += f"{self.halfmove_clock} {self.fullmove_number}"
-
-        return fen
+        # NB: The halfmove clock and fullmove number aren't part of the position key,
+        # since they don't have to match for the position to count as a repitition.
+        piece_placement_str = piece_placement.decode()
+        self._position_key = (piece_placement_str, turn, castling_rights, en_passant_square)
+        self._fen_cache = " ".join((*self._position_key, str(self.halfmove_clock), str(self.fullmove_number)))
+        return self._fen_cache
 
     def _generate_random_board(self) -> str:
         print("Generating random board. This may take some time...")
 
-        colours: list[Colour] = ["WHITE", "BLACK"]
-        piece_names_lower: list[PieceName] = ["p", "q", "r", "b", "n"]
-
-        # It's more likely to have fewer than more of the same piece,
-        # so we use decreasing weights on occurences (with exception of no occurence).
-        weights_for_pawns = [5, 15, 45, 25, 5, 2, 1.5, 1, 0.5]
-        weights_for_queens = [35, 45, 10, 5, 2, 1.25, 0.875, 0.5, 0.25, 0.125]
-        weights_for_rooks_knights_bishops = [10, 35, 35, 10, 5, 2, 1.25, 0.875, 0.5, 0.25, 0.125]
-
         board_valid: bool = False
         attempt: int = 0
         while not board_valid:
@@ -265,99 +330,92 @@ class Board:
             black_king: Piece
             black_rooks: list[Piece] = []
 
-            board: BoardList = [[None for _ in range(8)] for _ in range(8)]
+            self._clear_squares()
 
-            for colour in colours:
-                num_pawns = random.choices(range(8 + 1), k=1, weights=weights_for_pawns)[0]
+            for colour in _COLOURS:
+                num_pawns = random.choices(range(8 + 1), k=1, weights=_WEIGHTS_FOR_PAWNS)[0]
 
                 max_num_queens = 1 + (8 - num_pawns)
                 num_queens = random.choices(
-                    range(max_num_queens + 1), k=1, weights=weights_for_queens[: max_num_queens + 1]
+                    range(max_num_queens + 1), k=1, weights=_WEIGHTS_FOR_QUEENS[: max_num_queens + 1]
                 )[0]
 
                 max_num_rooks = 2 + max((8 - num_pawns - num_queens), 0)
                 num_rooks = random.choices(
                     range(max_num_rooks + 1),
                     k=1,
-                    weights=weights_for_rooks_knights_bishops[: max_num_rooks + 1],
+                    weights=_WEIGHTS_FOR_ROOKS_KNIGHTS_BISHOPS[: max_num_rooks + 1],
                 )[0]
 
                 max_num_bishops = 2 + max((8 - num_pawns - num_queens - num_rooks, 0))
                 num_bishops = random.choices(
                     range(max_num_bishops + 1),
                     k=1,
-                    weights=weights_for_rooks_knights_bishops[: max_num_bishops + 1],
+                    weights=_WEIGHTS_FOR_ROOKS_KNIGHTS_BISHOPS[: max_num_bishops + 1],
                 )[0]
 
                 max_num_knights = 2 + max((8 - num_pawns - num_queens - num_rooks - num_bishops), 0)
                 num_knights = random.choices(
                     range(max_num_knights + 1),
                     k=1,
-                    weights=weights_for_rooks_knights_bishops[: max_num_knights + 1],
+                    weights=_WEIGHTS_FOR_ROOKS_KNIGHTS_BISHOPS[: max_num_knights + 1],
                 )[0]
 
-                piece_counts = (num_pawns, num_queens, num_rooks, num_bishops, num_knights)
-
-                for indx, num_of_piece in enumerate(piece_counts):
-                    for _ in range(num_of_piece):
-                        piece_name_lower = piece_names_lower[indx]
-
-                        while True:
-                            # Find a free square for this piece
-                            piece_row_indx = random.randint(1, 6) if piece_name_lower == "p" else random.randint(0, 7)
-                            piece_col_indx = random.randint(0, 7)
-                            if board[piece_row_indx][piece_col_indx] is None:
-                                break
-
-                        if colour == "WHITE":
-                            piece_name: PieceName = piece_name_lower.upper()  # type: ignore -- Python doesn't realise that uppercase piece name is still a piece name
-                            piece = Piece(piece_name, piece_col_indx, piece_row_indx)
-                            white_pieces.append(piece)
-                            if piece_name == "R":
-                                white_rooks.append(piece)
-                        else:
-                            piece = Piece(piece_name_lower, piece_col_indx, piece_row_indx)
-                            black_pieces.append(piece)
-                            if piece_name_lower == "r":
-                                black_rooks.append(piece)
-
-                        board[piece_row_indx][piece_col_indx] = piece
-
-                while True:
-                    # Find a free square for the king
-                    king_row_indx = random.randint(0, 7)
-                    king_col_indx = random.randint(0, 7)
-                    if board[king_row_indx][king_col_indx] is None:
-                        break
-
-                if colour == "WHITE":
-                    white_king = Piece("K", king_col_indx, king_row_indx)
-                    white_pieces.append(white_king)
-                    board[king_row_indx][king_col_indx] = white_king
-                else:
-                    black_king = Piece("k", king_col_indx, king_row_indx)
-                    black_pieces.append(black_king)
-                    board[king_row_indx][king_col_indx] = black_king
+                piece_names_lower: list[PieceName] = [
+                    *["p"] * num_pawns,
+                    *["q"] * num_queens,
+                    *["r"] * num_rooks,
+                    *["b"] * num_bishops,
+                    *["n"] * num_knights,
+                    "k",
+                ]
+
+                # Pick distinct free squares for all of the pieces up front. Pawns can't be on the first or last row,
+                # so their squares are picked first from the rows they're allowed on.
+                pawn_squares = random.sample(
+                    [square for square in range(8, 56) if self._piece_at[square] is None], num_pawns
+                )
+                other_squares = random.sample(
+                    [square for square in range(64) if self._piece_at[square] is None and square not in pawn_squares],
+                    len(piece_names_lower) - num_pawns,
+                )
+
+                for piece_name_lower, square in zip(piece_names_lower, pawn_squares + other_squares):
+                    if colour == "WHITE":
+                        piece_name: PieceName = piece_name_lower.upper()  # type: ignore -- Python doesn't realise that uppercase piece name is still a piece name
+                        piece = Piece(piece_name, square & 7, square >> 3)
+                        white_pieces.append(piece)
+                        if piece_name == "R":
+                            white_rooks.append(piece)
+                        elif piece_name == "K":
+                            white_king = piece
+                    else:
+                        piece = Piece(piece_name_lower, square & 7, square >> 3)
+                        black_pieces.append(piece)
+                        if piece_name_lower == "r":
+                            black_rooks.append(piece)
+                        elif piece_name_lower == "k":
+                            black_king = piece
+
+                    self._set_piece_at(square, piece)
 
             self.white_pieces = PieceContainer(white_pieces, white_king, white_rooks)
             self.black_pieces = PieceContainer(black_pieces, black_king, black_rooks)
-            self.squares = board
 
             # Prevent white and black from starting in check
-            for own_move in self.generate_possible_moves():
-                if own_move.captured_piece is not None and own_move.captured_piece.name.lower() == "k":
-                    break
-            else:
-                for opponent_move in self.generate_possible_moves(for_opponent=True):
-                    if opponent_move.captured_piece is not None and opponent_move.captured_piece.name.lower() == "k":
-                        break
-                else:
-                    board_valid = True
+            board_valid = not (self.any_move_captures_king() or self.any_move_captures_king(for_opponent=True))
 
         fen = self._generate_fen()
         print(f"Generated random board in {attempt} attempts.")
         return fen
 
+    def any_move_captures_king(self, *, for_opponent: bool = False) -> bool:
+        # Whether the side to move (or their opponent) attacks the other side's king, checked straight
+        # from the attack tables rather than by generating every move and looking for a king capture.
+        attacker_colour: Colour = "WHITE" if (self.turn == "WHITE") != for_opponent else "BLACK"
+        king = (self.black_pieces if attacker_colour == "WHITE" else self.white_pieces).king
+        return self.is_square_attacked(king.row_indx * 8 + king.col_indx, attacker_colour)
+
     def generate_possible_moves(self, *, for_opponent: bool = False) -> Generator[Move, Any, None]:
         pieces_of_turn = (
             self.white_pieces
@@ -373,16 +431,277 @@ class Board:
                 f"Position must be a string of length 2, but got a string of length {len(position)}: {position!r}"
             )
 
-        if position[0] not in "abcdefgh":
+        # NB: The indexes are worked out from the character codes, since "a" is 97 and "1" is 49.
+        col_indx = ord(position[0]) - 97
+        if not 0 <= col_indx < 8:
             raise ValueError(f"Position must start with the column (one of 'abcdefgh'), but got {position[0]!r}")
 
-        if position[1] not in "12345678":
+        row_indx = ord(position[1]) - 49
+        if not 0 <= row_indx < 8:
             raise ValueError(f"Position must end with the row (one of '12345678'), but got {position[1]!r}")
 
-        col_indx = "abcdefgh".index(position[0])
-        row_indx = int(position[1]) - 1
-        return self.squares[row_indx][col_indx]
+        return self._piece_at[row_indx * 8 + col_indx]
+
+    def has_legal_move(self, *, for_opponent: bool = False) -> bool:
+        # Whether the side to move (or their opponent) has any legal move, cached by position since
+        # it's needed for every move that gives check (to look for checkmate) and after every move (for stalemate).
+        position_hash = self.zobrist_hash ^ zobrist.BLACK_TO_MOVE_KEY if for_opponent else self.zobrist_hash
+        if (has_legal_move := _HAS_LEGAL_MOVE_CACHE.get(position_hash)) is None:
+            pieces_container = (
+                self.white_pieces if (self.turn == "WHITE") != for_opponent else self.black_pieces
+            )
+            # Try the king first, as stepping out of the way is the most common escape from check.
+            king = pieces_container.king
+            # NB: When not in check, any move of a piece that isn't pinned is legal (see `Piece.has_legal_move`).
+            # When in check, every piece is treated as pinned so that each move is still tried out.
+            in_check = self.is_square_attacked(king.row_indx * 8 + king.col_indx, king.enemy_colour)
+            pinned = -1 if in_check else self.pinned_pieces(king.colour)
+            has_legal_move = king.has_legal_move(self) or any(
+                piece.has_legal_move(self, unpinned=not pinned >> (piece.row_indx * 8 + piece.col_indx) & 1)
+                for piece in pieces_container.all
+                if piece is not king
+            )
+            if len(_HAS_LEGAL_MOVE_CACHE) >= _HAS_LEGAL_MOVE_CACHE_SIZE:
+                # Evict the oldest entry, as dicts keep insertion order.
+                del _HAS_LEGAL_MOVE_CACHE[next(iter(_HAS_LEGAL_MOVE_CACHE))]
+            _HAS_LEGAL_MOVE_CACHE[position_hash] = has_legal_move
+        return has_legal_move
+
+    def is_square_attacked(self, square: int, by_colour: Colour, *, occupied: int | None = None) -> bool:
+        # `occupied` overrides the board's occupancy that sliding pieces are blocked by, e.g. to look past a moving king.
+        if occupied is None:
+            occupied = self.occupied
+        attackers = self.white if by_colour == "WHITE" else self.black
+        # NB: A pawn attacks `square` exactly when a pawn of the other colour on `square` would attack it back.
+        pawn_attacks = movegen.PAWN_ATTACKS["BLACK" if by_colour == "WHITE" else "WHITE"][square]
+        return bool(
+            movegen.KNIGHT_ATTACKS[square] & self.knights & attackers
+            or movegen.KING_ATTACKS[square] & self.kings & attackers
+            or pawn_attacks & self.pawns & attackers
+            or movegen.bishop_attacks(square, occupied) & (self.bishops | self.queens) & attackers
+            or movegen.rook_attacks(square, occupied) & (self.rooks | self.queens) & attackers
+        )
+
+    def pinned_pieces(self, colour: Colour) -> int:
+        # The bitboard of `colour`'s pieces that are pinned to their king, i.e. that are the only piece between it
+        # and an enemy slider, so moving them off that line could leave the king in check.
+        own_pieces, enemy_pieces = (self.white, self.black) if colour == "WHITE" else (self.black, self.white)
+        king = (self.white_pieces if colour == "WHITE" else self.black_pieces).king
+        straight_sliders = (self.rooks | self.queens) & enemy_pieces
+        diagonal_sliders = (self.bishops | self.queens) & enemy_pieces
+
+        pinned = 0
+        for direction, ray in enumerate(movegen.RAY_TABLE[king.row_indx * 8 + king.col_indx]):
+            if not (blockers := ray & self.occupied):
+                continue
+            # The nearest blocker is the lowest set bit for the first four directions, and the highest for the rest.
+            nearest = blockers & -blockers if direction < 4 else 1 << blockers.bit_length() - 1
+            if not nearest & own_pieces or not (blockers := blockers ^ nearest):
+                continue
+            next_nearest = blockers & -blockers if direction < 4 else 1 << blockers.bit_length() - 1
+            sliders = straight_sliders if direction in movegen.ROOK_DIRECTIONS else diagonal_sliders
+            if next_nearest & sliders:
+                pinned |= nearest
+        return pinned
+
+    def make(self, raw_moves: list[RawMove]) -> UndoInfo:
+        # Apply the move to this board in place, returning what's needed to `unmake` it again.
+        # NB: This doesn't set `prev_move`, since callers probing a move don't need it.
+        undo = UndoInfo(
+            self._fen_cache,
+            self.fullmove_number,
+            self.halfmove_clock,
+            self._pieces_cache,
+            self._position_key if self._fen_cache is not None else None,
+            self.turn,
+        )
+
+        piece_captured: bool = False
+        pawn_moved: bool = False
+
+        for raw_move in raw_moves:
+            old_piece, new_piece, captured_piece = raw_move
+
+            if old_piece._name_lower == "p":
+                pawn_moved = True
+
+            old_square = old_piece.row_indx * 8 + old_piece.col_indx
+            new_square = new_piece.row_indx * 8 + new_piece.col_indx
+
+            if self._piece_at[old_square] != old_piece:
+                if self._piece_at[new_square] != new_piece:
+                    raise ValueError(
+                        f"Move {raw_move} expected {old_piece!r} to be at {old_piece.col_indx, old_piece.row_indx}, but it's not:\n{self}"
+                    )
+                # NB: The board is only formatted if the warning is actually going to be logged.
+                logger.warning(
+                    "%r was already moved to %s.\n%s", old_piece, (new_piece.col_indx, new_piece.row_indx), self
+                )
+            self._set_piece_at_for_undo(old_square, None, undo)
+
+            if (
+                (existing_piece_at_new_square := self._piece_at[new_square]) is not None
+                and existing_piece_at_new_square != new_piece
+                and captured_piece is None
+            ):
+                raise ValueError(
+                    f"New square for {old_piece!r} was unexpectedly occupied by another piece: {existing_piece_at_new_square!r}."
+                )
+
+            if captured_piece is not None:
+                piece_captured = True
+                # We have to manually remove the taken piece from the corresponding list(s) of pieces, as it's not done automatically.
+                if captured_piece.colour == old_piece.colour:
+                    raise ValueError(
+                        f"Expected {old_piece!r} to take an enemy piece, but found own piece at new location: {captured_piece!r}."
+                    )
+                captured_pieces_container = self.white_pieces if captured_piece.colour == "WHITE" else self.black_pieces
+                indx = captured_pieces_container.index(captured_piece)
+                undo.all_pieces_entries.append((captured_pieces_container, indx, captured_pieces_container.pop(indx), True))
+                if captured_piece._name_lower == "r":
+                    rooks = captured_pieces_container.rooks
+                    indx = rooks.index(captured_piece)
+                    undo.rooks_entries.append((rooks, indx, rooks.pop(indx), True))
+
+                if not (
+                    captured_piece.row_indx == new_piece.row_indx and captured_piece.col_indx == new_piece.col_indx
+                ):
+                    if not (new_piece._name_lower == "p" and captured_piece._name_lower == "p"):
+                        raise ValueError(
+                            f"Expected {old_piece!r} to be taking a pawn via en-passant, but it's actually capturing {captured_piece!r}."
+                        )
+                    self._set_piece_at_for_undo(captured_piece.row_indx * 8 + captured_piece.col_indx, None, undo)
+
+            self._set_piece_at_for_undo(new_square, new_piece, undo)
+
+            # Note we again have to update the piece containers manually.
+            own_pieces_container = self.white_pieces if new_piece.colour == "WHITE" else self.black_pieces
+            indx = own_pieces_container.index(old_piece)
+            undo.all_pieces_entries.append((own_pieces_container, indx, own_pieces_container.set(indx, new_piece), False))
+            if new_piece._name_lower == "r":
+                rooks = own_pieces_container.rooks
+                indx = rooks.index(old_piece)
+                undo.rooks_entries.append((rooks, indx, rooks[indx], False))
+                rooks[indx] = new_piece
+            elif new_piece._name_lower == "k":
+                undo.kings.append((own_pieces_container, own_pieces_container.king))
+                own_pieces_container.king = new_piece
+
+        if pawn_moved or piece_captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+        if self.turn == "BLACK":
+            self.fullmove_number += 1
+            self.turn = "WHITE"
+        else:
+            self.turn = "BLACK"
+        self._fen_cache = None
+        self._pieces_cache = None
+        return undo
+
+    def unmake(self, undo: UndoInfo) -> None:
+        # Undo a `make`, restoring everything in the reverse order it was changed.
+        for pieces_container, king in reversed(undo.kings):
+            pieces_container.king = king
+        for pieces_container, indx, piece, removed in reversed(undo.all_pieces_entries):
+            if removed:
+                pieces_container.insert(indx, piece)
+            else:
+                pieces_container.set(indx, piece)
+        for rooks, indx, rook, removed in reversed(undo.rooks_entries):
+            if removed:
+                rooks.insert(indx, rook)
+            else:
+                rooks[indx] = rook
+        for square, piece in reversed(undo.squares):
+            self._set_piece_at(square, piece)
+
+        self.fullmove_number = undo.fullmove_number
+        self.halfmove_clock = undo.halfmove_clock
+        self.turn = undo.turn
+        self._fen_cache = undo.fen_cache
+        self._pieces_cache = undo.pieces_cache
+        if undo.position_key is not None:
+            self._position_key = undo.position_key
+
+    def _set_piece_at(self, square: int, piece: Piece | None) -> None:
+        """Put `piece` on the square (`row_indx * 8 + col_indx`), or empty it, keeping the bitboards in sync."""
+        bit = 1 << square
+        if (existing_piece := self._piece_at[square]) is not None:
+            self._zobrist ^= zobrist.PIECE_SQUARE_KEYS[existing_piece.name][square]
+            type_attr = _BITBOARD_FOR_PIECE_TYPE[existing_piece._name_lower]
+            setattr(self, type_attr, getattr(self, type_attr) & ~bit)
+            if existing_piece.colour == "WHITE":
+                self.white &= ~bit
+            else:
+                self.black &= ~bit
+            self.occupied &= ~bit
+
+        if piece is not None:
+            self._zobrist ^= zobrist.PIECE_SQUARE_KEYS[piece.name][square]
+            type_attr = _BITBOARD_FOR_PIECE_TYPE[piece._name_lower]
+            setattr(self, type_attr, getattr(self, type_attr) | bit)
+            if piece.colour == "WHITE":
+                self.white |= bit
+            else:
+                self.black |= bit
+            self.occupied |= bit
+            self._symbols[square] = ord(piece.name)
+            self._display_cells[square] = str(piece)
+        else:
+            self._symbols[square] = 0
+            self._display_cells[square] = _EMPTY_DISPLAY_CELL
+
+        self._piece_at[square] = piece
+        self._fen_cache = None
+
+    def _set_piece_at_for_undo(self, square: int, piece: Piece | None, undo: UndoInfo) -> None:
+        undo.squares.append((square, self._piece_at[square]))
+        self._set_piece_at(square, piece)
+
+    def iter_pieces(self) -> Generator[Piece, Any, None]:
+        # Prefer this over `pieces` when just iterating, as it doesn't need to build a list.
+        yield from self.white_pieces.all
+        yield from self.black_pieces.all
 
     @property
     def pieces(self) -> list[Piece]:
-        return self.white_pieces.all + self.black_pieces.all
+        if self._pieces_cache is None:
+            self._pieces_cache = self.white_pieces.all + self.black_pieces.all
+        return self._pieces_cache
+
+    @property
+    def position_key(self) -> PositionKey:
+        """The parts of the FEN that must match for two positions to be the same (for repitition)."""
+        if self._fen_cache is None:
+            self._generate_fen()
+        return self._position_key
+
+    @property
+    def zobrist_hash(self) -> int:
+        """The Zobrist hash of everything move generation depends on: the pieces, turn, castling rights and en passant."""
+        position_hash = self._zobrist
+        if self.turn == "BLACK":
+            position_hash ^= zobrist.BLACK_TO_MOVE_KEY
+        for castling_right in self._castling_rights():
+            position_hash ^= zobrist.CASTLING_KEYS[castling_right]
+        if self.prev_move and (ep_square := self.prev_move._ep_square) != -1:
+            # NB: En passant is only possible if the pawn that moved double is still there,
+            # which isn't the case while a later move is being probed with `make`.
+            pawn_square = ep_square + 8 if ep_square >> 3 == 2 else ep_square - 8
+            if (pawn := self._piece_at[pawn_square]) is not None and pawn.moved_double:
+                position_hash ^= zobrist.EN_PASSANT_KEYS[ep_square & 7]
+        return position_hash
+
+    @property
+    def flat_squares(self) -> list[Piece | None]:
+        # The piece on each square (or None), indexed by `row_indx * 8 + col_indx`.
+        # NB: Unlike `squares`, this is the board's own list, so it must not be written to and changes as the board does.
+        return self._piece_at
+
+    @property
+    def squares(self) -> BoardList:
+        # NB: This is a freshly built 8x8 view, so writing to it doesn't change the board.
+        return [self._piece_at[row_indx * 8 : row_indx * 8 + 8] for row_indx in range(8)]
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -7,7 +7,10 @@ if TYPE_CHECKING:
 from src.typings import CheckmatesEnemy, ChecksEnemy, ColumnIndex, RawMove, RowIndex
 
 
-@dataclass(repr=False, eq=False)
+_PAWN_NAMES = frozenset("pP")
+
+
+@dataclass(repr=False, eq=False, slots=True)
 class MoveComponent:
     before: Piece
     after: Piece
@@ -36,11 +39,66 @@ class MoveComponent:
         return f"{self.before.algebraic_position}{capture_str}{self.after.position}{pawn_promotion_str}{check_str}"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Move:
     components: list[MoveComponent]
 
+    # NB: Moves are never changed after creation, so these are computed once rather than on every access.
+    _captured_piece: Piece | None = field(init=False, repr=False)
+    _checks_enemy: bool = field(init=False, repr=False)
+    _checkmates_enemy: bool = field(init=False, repr=False)
+    # Square index (`row_indx * 8 + col_indx`) of the en passant target square, or -1 if there isn't one
+    _ep_square: int = field(init=False, repr=False)
+    # What the move does (squares moved between, whether it captures and the piece afterwards) for each component,
+    # sorted so that e.g. castling compares equal whether it was generated from the king or the rook.
+    _key_tuple: tuple[tuple[int, int, int, int, bool, str], ...] = field(init=False, repr=False)
+    _promotes_pawn: bool = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        captured_piece: Piece | None = None
+        checks_enemy = checkmates_enemy = promotes_pawn = False
+        for move_component in self.components:
+            captured_piece = captured_piece or move_component.captured_piece
+            checks_enemy = checks_enemy or move_component.checks_enemy
+            checkmates_enemy = checkmates_enemy or move_component.checkmates_enemy
+            promotes_pawn = promotes_pawn or move_component.after.name != move_component.before.name
+
+        self._captured_piece = captured_piece
+        self._checks_enemy = checks_enemy
+        self._checkmates_enemy = checkmates_enemy
+        self._promotes_pawn = promotes_pawn
+        self._key_tuple = tuple(
+            sorted(
+                (
+                    move_component.before.col_indx,
+                    move_component.before.row_indx,
+                    move_component.after.col_indx,
+                    move_component.after.row_indx,
+                    move_component.captured_piece is not None,
+                    move_component.after.name,
+                )
+                for move_component in self.components
+            )
+        )
+
+        if (
+            len(self.components) == 1
+            and (move_component := self.components[0]).before.name in _PAWN_NAMES
+            and abs(move_component.before.row_indx - move_component.after.row_indx) == 2
+        ):
+            # Moved pawn two forward, so the en passant square is the square behind the pawn.
+            # The row of square behind the pawn is the middle of the row before and after move.
+            self._ep_square = (
+                move_component.after.col_indx
+                + ((move_component.before.row_indx + move_component.after.row_indx) // 2) * 8
+            )
+        else:
+            self._ep_square = -1
+
     def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Move):
+            return self._key_tuple == other._key_tuple
+
         if isinstance(other, str):
             other = [other]
 
@@ -52,6 +110,9 @@ class Move:
             f"Unable to compare equality between type {type(self).__name__!r} and {type(other).__name__!r}."
         )
 
+    def __hash__(self) -> int:
+        return hash(self._key_tuple)
+
     def __lt__(self, other: Any) -> bool:
         if isinstance(other, Move):
             return self.components < other.components
@@ -73,12 +134,8 @@ class Move:
     def from_raw_moves(cls, raw_moves: list[tuple[RawMove, ChecksEnemy, CheckmatesEnemy]]) -> Move:
         return cls(
             [
-                *map(
-                    lambda raw_move: MoveComponent(
-                        raw_move[0][0], raw_move[0][1], raw_move[0][2], raw_move[1], raw_move[2]
-                    ),
-                    raw_moves,
-                )
+                MoveComponent(before, after, captured_piece, checks_enemy, checkmates_enemy)
+                for (before, after, captured_piece), checks_enemy, checkmates_enemy in raw_moves
             ]
         )
 
@@ -90,37 +147,26 @@ class Move:
 
     @property
     def captured_piece(self) -> Piece | None:
-        return next(
-            (move_component.captured_piece for move_component in self.components if move_component.captured_piece), None
-        )
+        return self._captured_piece
 
     @property
     def captures_piece(self) -> bool:
-        return self.captured_piece is not None
+        return self._captured_piece is not None
 
     @property
     def checks_enemy(self) -> bool:
-        return any(move_component.checks_enemy for move_component in self.components)
+        return self._checks_enemy
 
     @property
     def checkmates_enemy(self) -> bool:
-        return any(move_component.checkmates_enemy for move_component in self.components)
+        return self._checkmates_enemy
 
     @property
     def en_passant_square(self) -> tuple[ColumnIndex, RowIndex] | None:
-        if (
-            len(self.components) == 1
-            and (move_component := self.components[0]).before.name.lower() == "p"
-            and abs(move_component.before.col_indx - move_component.after.col_indx) == 2
-        ):
-            # Moved pawn two forward, so the en passant square is the square behind the pawn
-            return (
-                move_component.after.col_indx,
-                # The row of square behind the pawn is the middle of the row before and after move
-                (move_component.before.row_indx + move_component.after.row_indx) // 2,
-            )
-        return None
+        if self._ep_square == -1:
+            return None
+        return self._ep_square & 7, self._ep_square >> 3
 
     @property
     def promotes_pawn(self) -> bool:
-        return any(move_component.after.name != move_component.before.name for move_component in self.components)
+        return self._promotes_pawn
@@ -0,0 +1,101 @@
+from collections.abc import Generator
+from typing import Any
+
+from src.typings import Colour
+
+# Squares are indexed by `row_indx * 8 + col_indx`, so bit 0 of a bitboard is a1, bit 7 is h1 and bit 63 is h8.
+
+_KING_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+_KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+
+# Ray directions as (row_offset, col_offset). The first four directions increase the square index
+# as they go (so their nearest blocker is the lowest set bit) and the last four decrease it (highest set bit).
+_DIRECTION_OFFSETS = ((1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1))
+NORTH, EAST, NORTH_EAST, NORTH_WEST, SOUTH, WEST, SOUTH_WEST, SOUTH_EAST = range(8)
+BISHOP_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_WEST, SOUTH_EAST)
+ROOK_DIRECTIONS = (NORTH, EAST, SOUTH, WEST)
+
+
+def _step_attacks(square: int, offsets: tuple[tuple[int, int], ...]) -> int:
+    row_indx, col_indx = divmod(square, 8)
+    attacks = 0
+    for row_offset, col_offset in offsets:
+        new_row_indx = row_indx + row_offset
+        new_col_indx = col_indx + col_offset
+        if not (new_row_indx | new_col_indx) & ~7:  # i.e. both are 0..7
+            attacks |= 1 << (new_row_indx * 8 + new_col_indx)
+    return attacks
+
+
+def _ray(square: int, row_offset: int, col_offset: int) -> int:
+    row_indx, col_indx = divmod(square, 8)
+    ray = 0
+    while not ((row_indx := row_indx + row_offset) | (col_indx := col_indx + col_offset)) & ~7:
+        ray |= 1 << (row_indx * 8 + col_indx)
+    return ray
+
+
+KING_ATTACKS: tuple[int, ...] = tuple(_step_attacks(square, _KING_OFFSETS) for square in range(64))
+KNIGHT_ATTACKS: tuple[int, ...] = tuple(_step_attacks(square, _KNIGHT_OFFSETS) for square in range(64))
+PAWN_ATTACKS: dict[Colour, tuple[int, ...]] = {
+    "WHITE": tuple(_step_attacks(square, ((1, -1), (1, 1))) for square in range(64)),
+    "BLACK": tuple(_step_attacks(square, ((-1, -1), (-1, 1))) for square in range(64)),
+}
+# RAY_TABLE[square][direction] is every square from `square` (exclusive) to the edge of the board in `direction`.
+RAY_TABLE: tuple[tuple[int, ...], ...] = tuple(
+    tuple(_ray(square, row_offset, col_offset) for row_offset, col_offset in _DIRECTION_OFFSETS)
+    for square in range(64)
+)
+
+
+def _sliding_attacks(square: int, occupied: int, directions: tuple[int, ...]) -> int:
+    rays = RAY_TABLE[square]
+    attacks = 0
+    for direction in directions:
+        ray = rays[direction]
+        if blockers := ray & occupied:
+            # The ray stops at (and includes) the nearest blocker, so remove everything behind it.
+            blocker = (blockers & -blockers).bit_length() - 1 if direction < 4 else blockers.bit_length() - 1
+            ray ^= RAY_TABLE[blocker][direction]
+        attacks |= ray
+    return attacks
+
+
+def _relevant_occupancy(square: int, directions: tuple[int, ...]) -> int:
+    mask = 0
+    for direction in directions:
+        if ray := RAY_TABLE[square][direction]:
+            # The last square of a ray has nothing behind it to block, so whether it's occupied never changes the attacks.
+            edge = ray.bit_length() - 1 if direction < 4 else (ray & -ray).bit_length() - 1
+            mask |= ray ^ (1 << edge)
+    return mask
+
+
+# The squares whose occupancy decides where a slider on each square can reach, i.e. the magic bitboard masks.
+_BISHOP_MASKS: tuple[int, ...] = tuple(_relevant_occupancy(square, BISHOP_DIRECTIONS) for square in range(64))
+_ROOK_MASKS: tuple[int, ...] = tuple(_relevant_occupancy(square, ROOK_DIRECTIONS) for square in range(64))
+# Slider attacks per square, keyed by the masked occupancy. Rather than finding magic multipliers to pack the
+# occupancy into a dense index, Python's dicts hash it directly, and entries are filled in as positions are seen.
+_BISHOP_ATTACKS: tuple[dict[int, int], ...] = tuple({} for _ in range(64))
+_ROOK_ATTACKS: tuple[dict[int, int], ...] = tuple({} for _ in range(64))
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    occupied &= _BISHOP_MASKS[square]
+    if (attacks := _BISHOP_ATTACKS[square].get(occupied)) is None:
+        attacks = _BISHOP_ATTACKS[square][occupied] = _sliding_attacks(square, occupied, BISHOP_DIRECTIONS)
+    return attacks
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    occupied &= _ROOK_MASKS[square]
+    if (attacks := _ROOK_ATTACKS[square].get(occupied)) is None:
+        attacks = _ROOK_ATTACKS[square][occupied] = _sliding_attacks(square, occupied, ROOK_DIRECTIONS)
+    return attacks
+
+
+def iter_squares(bitboard: int) -> Generator[int, Any, None]:
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
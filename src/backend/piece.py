@@ -1,12 +1,11 @@
 from __future__ import annotations
-import traceback
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Literal, overload
 
 if TYPE_CHECKING:
     from src.backend.board import Board
-from src.backend import utils
+from src.backend import movegen, utils
 from src.backend.move import Move
 from src.typings import (
     CheckmatesEnemy,
@@ -23,6 +22,26 @@ from src.typings import (
 
 
 class Piece:
+    __slots__ = (
+        "algebraic_position",
+        "can_castle",
+        "col_indx",
+        "colour",
+        "enemy_colour",
+        "moved_double",
+        "name",
+        "position",
+        "row_indx",
+        "_name_lower",
+    )
+
+    # NB: A piece never changes name or square (moving creates a new Piece), so these are computed once in __init__.
+    algebraic_position: str
+    colour: Colour
+    enemy_colour: Colour
+    position: Position
+    _name_lower: str
+
     can_castle: bool
     moved_double: bool
     col_indx: int
@@ -31,13 +50,20 @@ class Piece:
 
     def __init__(self, name: PieceName, col_indx: int, row_indx: int) -> None:
         self.name = name
-
-        if not (0 <= col_indx < 8):
-            raise ValueError(f"col_indx must be 0..7, but got {col_indx=}")
-        if not (0 <= row_indx < 8):
+        self.colour = "WHITE" if name.isupper() else "BLACK"
+        self.enemy_colour = "BLACK" if self.colour == "WHITE" else "WHITE"
+        self._name_lower = name.lower()
+
+        # Both indexes are 0..7 exactly when neither has a bit set above the lowest three
+        # (which includes negative numbers, as they have every high bit set).
+        if (col_indx | row_indx) & ~7:
+            if not (0 <= col_indx < 8):
+                raise ValueError(f"col_indx must be 0..7, but got {col_indx=}")
             raise ValueError(f"row_indx must be 0..7, but got {row_indx=}")
         self.col_indx = col_indx
         self.row_indx = row_indx
+        self.position = f"{utils.column_index_to_letter(col_indx)}{row_indx + 1}"
+        self.algebraic_position = f"{name}{self.position}"
 
         # Piece is deemed to be able to castle if it's a king or rook in its starting position.
         # Note that this ignores whether the king has ever been in check, since this is handled via CHECKED event.
@@ -51,15 +77,26 @@ class Piece:
         }
         self.moved_double = False
 
+    def __deepcopy__(self, memo: dict[int, Any]) -> Piece:
+        # Pieces are never changed once they're on a board, as moving creates a new Piece, so copies can share them.
+        return self
+
     def __eq__(self, other: Any) -> bool:
+        if other is self:
+            # Pieces are often compared against themselves (e.g. pooled pieces, or looking one up in a piece list).
+            return True
+
         if other is None:
             return False
 
-        if isinstance(other, Piece):
+        if type(other) is Piece:
             return self.col_indx == other.col_indx and self.row_indx == other.row_indx and self.name == other.name
 
         raise NotImplementedError(f"Can't compare Piece with type {type(other).__name__!r}")
 
+    def __hash__(self) -> int:
+        return hash((self.name, self.col_indx, self.row_indx))
+
     def __repr__(self) -> str:
         return f"Piece({self.colour}, {self.name}, {self.col_indx}, {self.row_indx})"
 
@@ -68,111 +105,29 @@ class Piece:
 
     @staticmethod
     def _check_enemy_in_check_or_checkmate(
-        board: Board, own_pieces: list[Piece], enemy_king: Piece
+        board: Board, enemy_king: Piece, *, castled_rook: Piece | None = None
     ) -> tuple[ChecksEnemy, CheckmatesEnemy]:
-        enemy_in_check: bool = False
-        enemy_in_checkmate: bool = False
-        for own_piece in own_pieces:
-            if own_piece.can_move_to(enemy_king.row_indx, enemy_king.col_indx, board):
-                enemy_in_check = True
-                break
+        enemy_king_square = enemy_king.row_indx * 8 + enemy_king.col_indx
+        if castled_rook is not None:
+            # Only the rook that was castled with can be checking the enemy after castling.
+            castled_rook_square = castled_rook.row_indx * 8 + castled_rook.col_indx
+            enemy_in_check = bool(movegen.rook_attacks(castled_rook_square, board.occupied) >> enemy_king_square & 1)
+        else:
+            enemy_in_check = board.is_square_attacked(enemy_king_square, enemy_king.enemy_colour)
 
+        enemy_in_checkmate: bool = False
         if enemy_in_check:
-            enemy_in_checkmate = True
-            for _ in board.generate_possible_moves(for_opponent=enemy_king.colour != board.turn):
-                # There's at least one possible move for the opponent, so they're not in checkmate.
-                enemy_in_checkmate = False
-                break
+            # The enemy is only in checkmate if they don't have a single possible move.
+            enemy_in_checkmate = not board.has_legal_move(for_opponent=enemy_king.colour != board.turn)
 
         return enemy_in_check, enemy_in_checkmate
 
     @staticmethod
     def _get_board_after_raw_moves(board: Board, raw_moves: list[RawMove]) -> Board:
+        # Only used for moves that are actually played, so that the previous board is left untouched.
+        # Probing a move should use `Board.make` and `Board.unmake` instead, as copying the board is slow.
         new_board = deepcopy(board)
-
-        piece_captured: bool = False
-        pawn_moved: bool = False
-
-        for raw_move in raw_moves:
-            old_piece, new_piece, captured_piece = raw_move
-
-            if old_piece.name.lower() == "p":
-                pawn_moved = True
-
-            if new_board.squares[old_piece.row_indx][old_piece.col_indx] != old_piece:
-                if new_board.squares[new_piece.row_indx][new_piece.col_indx] != new_piece:
-                    raise ValueError(
-                        f"Move {raw_move} expected {old_piece!r} to be at {old_piece.col_indx, old_piece.row_indx}, but it's not:\n{new_board}\n{board}"
-                    )
-                print(
-                    f"WARNING: {old_piece!r} was already moved to {new_piece.col_indx, new_piece.row_indx}.\n{new_board}\n{board}"
-                )
-            new_board.squares[old_piece.row_indx][old_piece.col_indx] = None
-
-            if (
-                (existing_piece_at_new_square := new_board.squares[new_piece.row_indx][new_piece.col_indx]) is not None
-                and existing_piece_at_new_square != new_piece
-                and captured_piece is None
-            ):
-                raise ValueError(
-                    f"New square for {old_piece!r} was unexpectedly occupied by another piece: {existing_piece_at_new_square!r}."
-                )
-
-            if captured_piece is not None:
-                piece_captured = True
-                # We have to manually remove the taken piece from the corresponding list(s) of pieces, as it's not done automatically.
-                if captured_piece.colour == old_piece.colour:
-                    raise ValueError(
-                        f"Expected {old_piece!r} to take an enemy piece, but found own piece at new location: {captured_piece!r}."
-                    )
-                if captured_piece.colour == "WHITE":
-                    new_board.white_pieces.all.remove(captured_piece)
-                    if captured_piece.name == "R":
-                        new_board.white_pieces.rooks.remove(captured_piece)
-                else:
-                    new_board.black_pieces.all.remove(captured_piece)
-                    if captured_piece.name == "r":
-                        new_board.black_pieces.rooks.remove(captured_piece)
-
-                if not (
-                    captured_piece.row_indx == new_piece.row_indx and captured_piece.col_indx == new_piece.col_indx
-                ):
-                    if not (new_piece.name.lower() == "p" and captured_piece.name.lower() == "p"):
-                        raise ValueError(
-                            f"Expected {old_piece!r} to be taking a pawn via en-passant, but it's actually capturing {captured_piece!r}."
-                        )
-                    new_board.squares[captured_piece.row_indx][captured_piece.col_indx] = None
-
-            new_board.squares[new_piece.row_indx][new_piece.col_indx] = new_piece
-
-            # Note we again have to update the piece containers manually.
-            if new_piece.colour == "WHITE":
-                try:
-                    new_board.white_pieces.all[new_board.white_pieces.all.index(old_piece)] = new_piece
-                    if new_piece.name == "R":
-                        new_board.white_pieces.rooks[new_board.white_pieces.rooks.index(old_piece)] = new_piece
-                    elif new_piece.name == "K":
-                        new_board.white_pieces.king = new_piece
-                except Exception as e:
-                    print(traceback.print_exception(e))
-                    raise e
-            else:
-                new_board.black_pieces.all[new_board.black_pieces.all.index(old_piece)] = new_piece
-                if new_piece.name == "r":
-                    new_board.black_pieces.rooks[new_board.black_pieces.rooks.index(old_piece)] = new_piece
-                elif new_piece.name == "k":
-                    new_board.black_pieces.king = new_piece
-
-        if pawn_moved or piece_captured:
-            new_board.halfmove_clock = 0
-        else:
-            new_board.halfmove_clock += 1
-
-        if new_board.turn == "BLACK":
-            new_board.fullmove_number += 1
-            new_board.turn = "WHITE"
-        else:
-            new_board.turn = "BLACK"
+        new_board.make(raw_moves)
         return new_board
 
     @overload
@@ -186,21 +141,13 @@ class Piece:
     def generate_possible_moves(
         self, board: Board, *, check_for_checks: bool = True
     ) -> Generator[Move | list[RawMove], Any, None]:
-        name_lower = self.name.lower()
-
-        for raw_moves in (
-            self._pawn_moves(board)
-            if name_lower == "p"
-            else self._knight_moves(board)
-            if name_lower == "n"
-            else self._bishop_moves(board)
-            if name_lower == "b"
-            else self._rook_moves(board)
-            if name_lower == "r"
-            else self._queen_moves(board)
-            if name_lower == "q"
-            else self._king_moves(board)
-        ):
+        # NB: `Board.make` changes the piece containers in place, so these stay valid throughout.
+        is_white = self.colour == "WHITE"
+        own_pieces_container = board.white_pieces if is_white else board.black_pieces
+        enemy_pieces_container = board.black_pieces if is_white else board.white_pieces
+        enemy_king_name = "k" if is_white else "K"
+
+        for raw_moves in _MOVE_GENERATORS[self._name_lower](self, board):
             if check_for_checks is False:
                 # Currently in a fake-state that's part of checking for what was originally self-check.
                 # This means we don't need to care about self/enemy being in check.
@@ -215,118 +162,99 @@ class Piece:
                 # For castling we don't need to check if self in check since that's done in move generation.
                 # We do however need to check if the enemy is now in check/checkmate,
                 # but we only need to check that the rook that was castled with is checking enemy.
-                rooks_moved = [*filter(lambda x: x[1].name.lower() == "r", raw_moves)]
+                rooks_moved = [raw_move for raw_move in raw_moves if raw_move[1]._name_lower == "r"]
                 if len(rooks_moved) == 0:
                     raise ValueError("Failed to find the rook that was moved when castling.")
                 if len(rooks_moved) > 1:
                     raise ValueError("Multiple rooks were somehow moved when castling.")
                 rook_castled_with_after_move = rooks_moved[0][1]
 
-                board_after_castling = Piece._get_board_after_raw_moves(board, raw_moves)
-
-                enemy_king = (
-                    board_after_castling.black_pieces if self.colour == "WHITE" else board_after_castling.white_pieces
-                ).king
-
+                # NB: The board must be unmade before yielding, as the caller may use it before resuming us.
+                undo = board.make(raw_moves)
+                enemy_king = enemy_pieces_container.king
                 enemy_in_check, enemy_in_checkmate = Piece._check_enemy_in_check_or_checkmate(
-                    board_after_castling, [rook_castled_with_after_move], enemy_king
+                    board, enemy_king, castled_rook=rook_castled_with_after_move
                 )
+                board.unmake(undo)
 
                 yield Move.from_raw_moves(
                     [
-                        *map(
-                            # Only mark the rook as initiating check/checkmate
-                            lambda raw_move: (raw_move, enemy_in_check, enemy_in_checkmate)
-                            if raw_move[0].name.lower() == "r"
-                            else (raw_move, False, False),
-                            raw_moves,
-                        )
+                        # Only mark the rook as initiating check/checkmate
+                        (raw_move, enemy_in_check, enemy_in_checkmate)
+                        if raw_move[0]._name_lower == "r"
+                        else (raw_move, False, False)
+                        for raw_move in raw_moves
                     ]
                 )
                 continue
 
             if move_takes_enemy_piece:
                 if (
-                    piece_taken := board.squares[new_row_indx][new_col_indx]
-                ) is not None and piece_taken.name.lower() == ("k" if self.colour == "WHITE" else "K"):
+                    piece_taken := board._piece_at[new_row_indx * 8 + new_col_indx]
+                ) is not None and piece_taken.name == enemy_king_name:
                     # Directly taking enemy king, so never any reason could be invalid.
                     yield Move.from_raw_moves([(raw_moves[0], True, True)])
                     continue
 
             # First move in chain, so check whether WE will be in check after move,
             # and if not then whether the ENEMY will be in check after move.
-            board_after_move = Piece._get_board_after_raw_moves(board, raw_moves)
+            # NB: The board must be unmade before yielding, as the caller may use it before resuming us.
+            undo = board.make(raw_moves)
 
-            own_pieces_container = (
-                board_after_move.white_pieces if self.colour == "WHITE" else board_after_move.black_pieces
-            )
-            own_pieces = own_pieces_container.all
             own_king = own_pieces_container.king
-
-            enemy_pieces_container = (
-                board_after_move.black_pieces if self.colour == "WHITE" else board_after_move.white_pieces
-            )
-            enemy_pieces = enemy_pieces_container.all
             enemy_king = enemy_pieces_container.king
 
-            self_in_check: bool = False
-            for enemy_piece in enemy_pieces:
-                if enemy_piece.can_move_to(own_king.row_indx, own_king.col_indx, board_after_move):
-                    self_in_check = True
-                    break
-
-            if self_in_check:
+            if board.is_square_attacked(own_king.row_indx * 8 + own_king.col_indx, self.enemy_colour):
                 # We'd be in check after this move, and aren't taking enemy king, so can't make move.
+                board.unmake(undo)
                 continue
 
             # We won't be in check ourselves after this move, so check whether the enemy would be:
-            enemy_in_check, enemy_in_checkmate = Piece._check_enemy_in_check_or_checkmate(
-                board_after_move, own_pieces, enemy_king
-            )
+            enemy_in_check, enemy_in_checkmate = Piece._check_enemy_in_check_or_checkmate(board, enemy_king)
+            board.unmake(undo)
             yield Move.from_raw_moves([(raw_moves[0], enemy_in_check, enemy_in_checkmate)])
 
-    def _bishop_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
-        for row_offset in range(-1, 2, 2):
-            for col_offset in range(-1, 2, 2):
-                for i in range(1, 8):
-                    if not (
-                        (new_row_indx := self.row_indx + i * row_offset) in range(8)
-                        and (new_col_indx := self.col_indx + i * col_offset) in range(8)
-                    ):
-                        # Would be off the board, so stop
-                        break
-
-                    if (captured_piece := board.squares[new_row_indx][new_col_indx]) is None:
-                        # The space is empty
-                        new_self = Piece(self.name, new_col_indx, new_row_indx)
-                        yield [(self, new_self, captured_piece)]
-                        continue
-                    # The space isn't empty, so check if it's a piece we can take.
-                    if captured_piece.colour != self.colour:
-                        new_self = Piece(self.name, new_col_indx, new_row_indx)
-                        yield [(self, new_self, captured_piece)]
-                    break  # We can't move past another piece
+    def has_legal_move(self, board: Board, *, unpinned: bool = False) -> bool:
+        # Whether `generate_possible_moves` would yield anything, without working out whether each move checks the enemy.
+        # `unpinned` says that this piece isn't pinned and its king isn't in check, so its moves can't expose the king.
+        own_pieces_container = board.white_pieces if self.colour == "WHITE" else board.black_pieces
+        enemy_king_name = "k" if self.colour == "WHITE" else "K"
+        for raw_moves in _MOVE_GENERATORS[self._name_lower](self, board):
+            if len(raw_moves) > 1:
+                # Castling, which is only generated if it's legal.
+                return True
+
+            _, new_piece, move_takes_enemy_piece = raw_moves[0]
+            new_square = new_piece.row_indx * 8 + new_piece.col_indx
+            is_en_passant = False
+            if move_takes_enemy_piece:
+                if (piece_taken := board._piece_at[new_square]) is None:
+                    # NB: En passant also takes a pawn off of the king's row, which could uncover a check.
+                    is_en_passant = True
+                elif piece_taken.name == enemy_king_name:
+                    # Directly taking enemy king, so never any reason could be invalid.
+                    return True
 
-    def _king_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
-        for row_offset in range(-1, 2):
-            for col_offset in range(-1, 2):
-                if row_offset == col_offset == 0:
-                    # Can't move to the same position
-                    continue
+            if unpinned and not is_en_passant:
+                return True
 
-                if not (
-                    (new_row_indx := self.row_indx + row_offset) in range(8)
-                    and (new_col_indx := self.col_indx + col_offset) in range(8)
-                ):
-                    # Would be off the board, so stop
-                    continue
+            undo = board.make(raw_moves)
+            own_king = own_pieces_container.king
+            in_check = board.is_square_attacked(own_king.row_indx * 8 + own_king.col_indx, self.enemy_colour)
+            board.unmake(undo)
+            if not in_check:
+                return True
+        return False
 
-                if (
-                    captured_piece := board.squares[new_row_indx][new_col_indx]
-                ) is None or captured_piece.colour != self.colour:
-                    new_self = Piece(self.name, new_col_indx, new_row_indx)
-                    new_self.can_castle = False  # Can no longer castle after moving
-                    yield [(self, new_self, captured_piece)]
+    def _bishop_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
+        own_pieces = board.white if self.colour == "WHITE" else board.black
+        targets = movegen.bishop_attacks(self.row_indx * 8 + self.col_indx, board.occupied) & ~own_pieces
+        yield from self._moves_to_targets(board, targets)
+
+    def _king_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
+        own_pieces = board.white if self.colour == "WHITE" else board.black
+        targets = movegen.KING_ATTACKS[self.row_indx * 8 + self.col_indx] & ~own_pieces
+        yield from self._moves_to_targets(board, targets)
 
         # Castling
         own_rooks = (board.white_pieces if self.colour == "WHITE" else board.black_pieces).rooks
@@ -335,98 +263,77 @@ class Piece:
                 castling_col_direction = 1 if rook.col_indx > self.col_indx else -1
 
                 new_king_col_indx = self.col_indx + 2 * castling_col_direction
-                new_king = Piece(self.name, new_king_col_indx, self.row_indx)
+                new_king = _make_piece(self.name, new_king_col_indx, self.row_indx)
 
                 # If rook is queen-side then it moves 3 squares not 2
                 rook_col_offset = 3 if rook.col_indx < self.col_indx else 2
                 new_rook_col_indx = rook.col_indx - rook_col_offset * castling_col_direction
-                new_rook = Piece(rook.name, new_rook_col_indx, rook.row_indx)
+                new_rook = _make_piece(rook.name, new_rook_col_indx, rook.row_indx)
 
                 yield [(self, new_king, None), (rook, new_rook, None)]
 
     def _knight_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
-        # Moving two rows and one column
-        for row_offset in range(-2, 3, 4):
-            for col_offset in range(-1, 2, 2):
-                if not (
-                    (new_row_indx := self.row_indx + row_offset) in range(8)
-                    and (new_col_indx := self.col_indx + col_offset) in range(8)
-                ):
-                    # Would be off the board, so stop
-                    continue
-
-                if (
-                    captured_piece := board.squares[new_row_indx][new_col_indx]
-                ) is None or captured_piece.colour != self.colour:
-                    new_self = Piece(self.name, new_col_indx, new_row_indx)
-                    yield [(self, new_self, captured_piece)]
-
-        # Moving two columns and one row
-        for row_offset in range(-1, 2, 2):
-            for col_offset in range(-2, 3, 4):
-                if not (
-                    (new_row_indx := self.row_indx + row_offset) in range(8)
-                    and (new_col_indx := self.col_indx + col_offset) in range(8)
-                ):
-                    # Would be off the board, so stop
-                    continue
+        own_pieces = board.white if self.colour == "WHITE" else board.black
+        targets = movegen.KNIGHT_ATTACKS[self.row_indx * 8 + self.col_indx] & ~own_pieces
+        yield from self._moves_to_targets(board, targets)
 
-                if (
-                    captured_piece := board.squares[new_row_indx][new_col_indx]
-                ) is None or captured_piece.colour != self.colour:
-                    new_self = Piece(self.name, new_col_indx, new_row_indx)
-                    yield [(self, new_self, captured_piece)]
+    def _moves_to_targets(self, board: Board, targets: int) -> Generator[list[RawMove], Any, None]:
+        # Materialise a move to each target square. Whether the target is empty or an enemy piece (and
+        # hence reachable) has already been decided by the bitboards, so we only need to look up captures.
+        for new_square in movegen.iter_squares(targets):
+            new_self = _make_piece(self.name, new_square & 7, new_square >> 3)
+            yield [(self, new_self, board._piece_at[new_square])]
 
     def _pawn_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
-        row_offset = 1 if self.colour == "WHITE" else -1
-        if (new_row_indx := self.row_indx + row_offset) not in range(8):
+        is_white = self.colour == "WHITE"
+        row_offset = 1 if is_white else -1
+        if not 0 <= (new_row_indx := self.row_indx + row_offset) < 8:
             # Would be off the board, so stop. Note that this situation
             # shouldn't ever happen, as should have promoted to a different piece.
             # return
             raise ValueError(f"Somehow ended up with a non-promoted pawn on the end row: {self!r}.")
 
+        # Every move but the double forward move ends on the same row, so they all promote (or not) alike.
+        # TODO: Allow player to choose promotion piece
+        new_name = self.name if new_row_indx not in (0, 7) else "Q" if is_white else "q"
+
         # Forward Move
-        if board.squares[new_row_indx][self.col_indx] is None:
-            # TODO: Allow player to choose promotion piece
-            new_name = self.name if new_row_indx not in {0, 7} else "Q" if self.colour == "WHITE" else "q"
-            new_self = Piece(new_name, self.col_indx, new_row_indx)
+        if board._piece_at[new_row_indx * 8 + self.col_indx] is None:
+            new_self = _make_piece(new_name, self.col_indx, new_row_indx)
             yield [(self, new_self, None)]
 
             # Double Forward Move
+            double_forward_row_indx = self.row_indx + 2 * row_offset
             if (
-                (self.row == 2 and self.colour == "WHITE") or (self.row == 7 and self.colour == "BLACK")
-            ) and board.squares[(double_forward_row_indx := self.row_indx + 2 * row_offset)][self.col_indx] is None:
+                self.row_indx == (1 if is_white else 6)
+                and board._piece_at[double_forward_row_indx * 8 + self.col_indx] is None
+            ):
                 # Is in starting position and the two spaces infront is clear
-                new_self = Piece(self.name, self.col_indx, double_forward_row_indx)
-                new_self.moved_double = True
+                new_self = _make_piece(self.name, self.col_indx, double_forward_row_indx, moved_double=True)
                 yield [(self, new_self, None)]
 
         # Diagonal Move
-        for col_offset in range(-1, 2, 2):
-            if not 0 <= (new_col_indx := self.col_indx + col_offset) <= 7:
-                # Would be off the board, so skip
-                continue
-
-            new_name = self.name if new_row_indx not in {0, 7} else "Q" if self.colour == "WHITE" else "q"
-
-            if (
-                captured_piece := board.squares[new_row_indx][new_col_indx]
-            ) is not None and captured_piece.colour != self.colour:
-                # There's an enemy piece that this pawn can take
-                new_self = Piece(new_name, new_col_indx, new_row_indx)
-                yield [(self, new_self, captured_piece)]
-
-            # En Passant
-
+        square = self.row_indx * 8 + self.col_indx
+        attacks = movegen.PAWN_ATTACKS[self.colour][square]
+        for new_square in movegen.iter_squares(attacks & (board.black if is_white else board.white)):
+            # There's an enemy piece that this pawn can take
+            new_self = _make_piece(new_name, new_square & 7, new_row_indx)
+            yield [(self, new_self, board._piece_at[new_square])]
+
+        # En Passant
+        # NB: Only the en passant target square of the previous move can be taken onto, so there's no need to
+        # look at both diagonals.
+        prev_move = board.prev_move
+        if prev_move and (ep_square := prev_move._ep_square) != -1 and attacks >> ep_square & 1:
+            new_col_indx = ep_square & 7
             if (
-                (en_passant_captured_piece := board.squares[self.row_indx][new_col_indx]) is not None
-                and en_passant_captured_piece.colour != self.colour
+                (en_passant_captured_piece := board._piece_at[self.row_indx * 8 + new_col_indx]) is not None
+                and en_passant_captured_piece.colour == self.enemy_colour
                 and en_passant_captured_piece.moved_double
-                and board.prev_move
-                and board.prev_move.ends_at(new_col_indx, self.row_indx)
+                and prev_move.ends_at(new_col_indx, self.row_indx)
             ):
                 # There's an enemy pawn that we can take via en-passant
-                new_self = Piece(new_name, new_col_indx, new_row_indx)
+                new_self = _make_piece(new_name, new_col_indx, new_row_indx)
                 yield [(self, new_self, en_passant_captured_piece)]
 
     def _queen_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
@@ -436,45 +343,9 @@ class Piece:
         yield from self._bishop_moves(board)
 
     def _rook_moves(self, board: Board) -> Generator[list[RawMove], Any, None]:
-        # Vertical Movement
-        for row_offset in range(-1, 2):
-            for i in range(1, 8):
-                if (new_row_indx := self.row_indx + i * row_offset) not in range(8):
-                    # Would be off the board, so stop
-                    break
-
-                if (captured_piece := board.squares[new_row_indx][self.col_indx]) is None:
-                    # The space is empty
-                    new_self = Piece(self.name, self.col_indx, new_row_indx)
-                    new_self.can_castle = False  # Can no longer castle after moving
-                    yield [(self, new_self, None)]
-                    continue
-                # The space isn't empty, so check if it's a piece we can take.
-                if captured_piece.colour != self.colour:
-                    new_self = Piece(self.name, self.col_indx, new_row_indx)
-                    new_self.can_castle = False  # Can no longer castle after moving
-                    yield [(self, new_self, captured_piece)]
-                break  # We can't move past another piece
-
-        # Horizontal Movement
-        for col_offset in range(-1, 2):
-            for i in range(1, 8):
-                if (new_col_indx := self.col_indx + i * col_offset) not in range(8):
-                    # Would be off the board, so stop
-                    break
-
-                if (captured_piece := board.squares[self.row_indx][new_col_indx]) is None:
-                    # The space is empty
-                    new_self = Piece(self.name, new_col_indx, self.row_indx)
-                    new_self.can_castle = False  # Can no longer castle after moving
-                    yield [(self, new_self, None)]
-                    continue
-                # The space isn't empty, so check if it's a piece we can take.
-                if captured_piece.colour != self.colour:
-                    new_self = Piece(self.name, new_col_indx, self.row_indx)
-                    new_self.can_castle = False  # Can no longer castle after moving
-                    yield [(self, new_self, captured_piece)]
-                break  # We can't move past another piece
+        own_pieces = board.white if self.colour == "WHITE" else board.black
+        targets = movegen.rook_attacks(self.row_indx * 8 + self.col_indx, board.occupied) & ~own_pieces
+        yield from self._moves_to_targets(board, targets)
 
         # Castling
         own_king = (board.white_pieces if self.colour == "WHITE" else board.black_pieces).king
@@ -485,13 +356,30 @@ class Piece:
             # If we're castling queen-side, then rook moves 3 squares, else 2 squares.
             rook_col_offset = 3 if castling_col_direction == 1 else 2
             new_rook_col_indx = self.col_indx + rook_col_offset * castling_col_direction
-            new_rook = Piece(self.name, new_rook_col_indx, self.row_indx)
+            new_rook = _make_piece(self.name, new_rook_col_indx, self.row_indx)
 
             new_king_col_indx = own_king.col_indx - 2 * castling_col_direction
-            new_king = Piece(own_king.name, new_king_col_indx, own_king.row_indx)
+            new_king = _make_piece(own_king.name, new_king_col_indx, own_king.row_indx)
 
             yield [(self, new_rook, None), (own_king, new_king, None)]
 
+    def attacks(self, board: Board) -> int:
+        """The bitboard of squares this piece attacks, whether they're empty or hold a piece of either colour."""
+        square = self.row_indx * 8 + self.col_indx
+        name_lower = self._name_lower
+        if name_lower == "p":
+            return movegen.PAWN_ATTACKS[self.colour][square]
+        if name_lower == "n":
+            return movegen.KNIGHT_ATTACKS[square]
+        if name_lower == "k":
+            return movegen.KING_ATTACKS[square]
+        attacks = 0
+        if name_lower in _SLIDES_DIAGONALLY:
+            attacks |= movegen.bishop_attacks(square, board.occupied)
+        if name_lower in _SLIDES_STRAIGHT:
+            attacks |= movegen.rook_attacks(square, board.occupied)
+        return attacks
+
     @staticmethod
     def can_castle_with(king: Piece, rook: Piece, board: Board) -> bool:
         if not (king.can_castle and rook.can_castle and king.colour == rook.colour):
@@ -500,25 +388,19 @@ class Piece:
         rook_col_direction = -1 * king_col_direction
 
         # King movement validation
+        # NB: The king has left its square while it passes through the others, so it no longer blocks attacks on them.
+        occupied_without_king = board.occupied ^ (1 << (king.row_indx * 8 + king.col_indx))
         for col_offset in range(1, 3):
             new_king_col_indx = king.col_indx + col_offset * king_col_direction
-            if board.squares[king.row_indx][new_king_col_indx] is not None:
+            new_king_square = king.row_indx * 8 + new_king_col_indx
+            if board._piece_at[new_king_square] is not None:
                 # There's a piece in the way of the king, so we can't castle with this rook
                 return False
 
             # Kings can't castle through check, so we need to ensure we aren't in check in this midway position
-
-            king_after_midway_move = Piece(king.name, new_king_col_indx, king.row_indx)
-            cloned_board = king._get_board_after_raw_moves(board, [(king, king_after_midway_move, None)])
-
-            # Check whether the king is in check
-            enemy_pieces = (cloned_board.black_pieces if king.colour == "WHITE" else cloned_board.white_pieces).all
-            for enemy_piece in enemy_pieces:
-                if enemy_piece.can_move_to(
-                    king_after_midway_move.row_indx, king_after_midway_move.col_indx, cloned_board
-                ):
-                    # Would be castling through check, so can't castle with this rook
-                    return False
+            if board.is_square_attacked(new_king_square, king.enemy_colour, occupied=occupied_without_king):
+                # Would be castling through check, so can't castle with this rook
+                return False
 
         # Rook movement validation
 
@@ -526,22 +408,23 @@ class Piece:
         squares_to_move_for_rook = 3 if rook.col_indx < king.col_indx else 2
         for col_offset in range(1, squares_to_move_for_rook + 1):
             new_rook_col_indx = rook.col_indx + col_offset * rook_col_direction
-            if board.squares[rook.row_indx][new_rook_col_indx] is not None:
+            if board._piece_at[rook.row_indx * 8 + new_rook_col_indx] is not None:
                 # There's a piece in the way of the rook, so we can't castle with this rook
                 return False
         return True
 
     def can_move_to(self, wanted_row_indx: RowIndex, wanted_col_indx: ColumnIndex, board: Board) -> bool:
+        if self._name_lower != "p" and not self.can_castle:
+            # Without pawn pushes or castling, a piece can move to exactly the squares it attacks that aren't its own.
+            own_pieces = board.white if self.colour == "WHITE" else board.black
+            return bool((self.attacks(board) & ~own_pieces) >> (wanted_row_indx * 8 + wanted_col_indx) & 1)
+
         for raw_moves in self.generate_possible_moves(board, check_for_checks=False):
             for _, new_piece, _ in raw_moves:
                 if new_piece.row_indx == wanted_row_indx and new_piece.col_indx == wanted_col_indx:
                     return True
         return False
 
-    @property
-    def algebraic_position(self) -> str:
-        return f"{self.name}{self.position}"
-
     @property
     def col(self) -> Column:
         return self.column
@@ -550,10 +433,6 @@ class Piece:
     def color(self) -> Colour:
         return self.colour
 
-    @property
-    def colour(self) -> Colour:
-        return "WHITE" if self.name.isupper() else "BLACK"
-
     @property
     def column(self) -> Column:
         return utils.column_index_to_letter(self.col_indx)
@@ -562,14 +441,35 @@ class Piece:
     def enemy_color(self) -> Colour:
         return self.enemy_colour
 
-    @property
-    def enemy_colour(self) -> Colour:
-        return "BLACK" if self.colour == "WHITE" else "WHITE"
-
-    @property
-    def position(self) -> Position:
-        return f"{self.col}{self.row}"
-
     @property
     def row(self) -> Row:
         return self.row_indx + 1
+
+
+# The (lowercase) names of the pieces that slide diagonally like a bishop, or straight like a rook.
+_SLIDES_DIAGONALLY = frozenset("bq")
+_SLIDES_STRAIGHT = frozenset("rq")
+
+# The pieces that moves end with, by (name, square, moved_double). Pieces are never changed once they're on a board,
+# so rather than allocating a new Piece for every generated move, the same instance is handed out each time.
+_PIECE_POOL: dict[tuple[PieceName, int, bool], Piece] = {}
+
+
+def _make_piece(name: PieceName, col_indx: int, row_indx: int, *, moved_double: bool = False) -> Piece:
+    key = (name, row_indx * 8 + col_indx, moved_double)
+    if (piece := _PIECE_POOL.get(key)) is None:
+        piece = _PIECE_POOL[key] = Piece(name, col_indx, row_indx)
+        piece.can_castle = False  # Can no longer castle after moving
+        piece.moved_double = moved_double
+    return piece
+
+
+# The generator of raw moves for each (lowercase) piece name.
+_MOVE_GENERATORS: dict[str, Callable[[Piece, Board], Generator[list[RawMove], Any, None]]] = {
+    "p": Piece._pawn_moves,
+    "n": Piece._knight_moves,
+    "b": Piece._bishop_moves,
+    "r": Piece._rook_moves,
+    "q": Piece._queen_moves,
+    "k": Piece._king_moves,
+}
@@ -1,10 +1,43 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from src.backend.piece import Piece
 
 
-@dataclass()
+@dataclass(slots=True)
 class PieceContainer:
     all: list[Piece]
     king: Piece
     rooks: list[Piece]
+    # The index in `all` of the piece on each square (`row_indx * 8 + col_indx`), so pieces can be found without
+    # searching `all`. NB: This is only kept in sync when `all` is changed through the methods below.
+    index_of: dict[int, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index_of = {piece.row_indx * 8 + piece.col_indx: indx for indx, piece in enumerate(self.all)}
+
+    def index(self, piece: Piece) -> int:
+        return self.index_of[piece.row_indx * 8 + piece.col_indx]
+
+    def insert(self, indx: int, piece: Piece) -> None:
+        self.all.insert(indx, piece)
+        # Every piece after the inserted one has moved along by one.
+        index_of = self.index_of
+        for later_piece in self.all[indx + 1 :]:
+            index_of[later_piece.row_indx * 8 + later_piece.col_indx] += 1
+        index_of[piece.row_indx * 8 + piece.col_indx] = indx
+
+    def pop(self, indx: int) -> Piece:
+        piece = self.all.pop(indx)
+        # Every piece after the removed one has moved back by one.
+        index_of = self.index_of
+        del index_of[piece.row_indx * 8 + piece.col_indx]
+        for later_piece in self.all[indx:]:
+            index_of[later_piece.row_indx * 8 + later_piece.col_indx] -= 1
+        return piece
+
+    def set(self, indx: int, piece: Piece) -> Piece:
+        old_piece = self.all[indx]
+        del self.index_of[old_piece.row_indx * 8 + old_piece.col_indx]
+        self.all[indx] = piece
+        self.index_of[piece.row_indx * 8 + piece.col_indx] = indx
+        return old_piece
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+
+from src.backend.piece import Piece
+from src.backend.piece_container import PieceContainer
+from src.typings import Colour, PositionKey
+
+
+@dataclass(slots=True)
+class UndoInfo:
+    # Everything `Board.make` changed, so that `Board.unmake` can put it back.
+    fen_cache: str | None
+    fullmove_number: int
+    halfmove_clock: int
+    pieces_cache: list[Piece] | None
+    position_key: PositionKey | None
+    turn: Colour
+    # The kings that were replaced, as (container, old king)
+    kings: list[tuple[PieceContainer, Piece]] = field(default_factory=list)
+    # The entries of `PieceContainer.all` that were changed in order, as (container, index, old piece, whether it was removed)
+    all_pieces_entries: list[tuple[PieceContainer, int, Piece, bool]] = field(default_factory=list)
+    # The entries of `PieceContainer.rooks` that were changed in order, as (rooks, index, old rook, whether it was removed)
+    rooks_entries: list[tuple[list[Piece], int, Piece, bool]] = field(default_factory=list)
+    # The squares that were changed in order, as (square, old piece)
+    squares: list[tuple[int, Piece | None]] = field(default_factory=list)
@@ -3,10 +3,21 @@ from src.typings import Column, ColumnIndex
 
 STARTING_BOARD_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
+# Square indices (`row_indx * 8 + col_indx`) of the corners, where the rooks start.
+SQ_A1 = 0
+SQ_H1 = 7
+SQ_A8 = 56
+SQ_H8 = 63
+
+_COLUMN_LETTERS: tuple[Column, ...] = ("a", "b", "c", "d", "e", "f", "g", "h")
+_COLUMN_INDEX_FOR_LETTER: dict[str, ColumnIndex] = {letter: col_indx for col_indx, letter in enumerate(_COLUMN_LETTERS)}
+
 
 def column_index_to_letter(col_indx: int) -> Column:
-    return "abcdefgh"[col_indx]  # type: ignore -- Python doesn't narrow subscriptions
+    return _COLUMN_LETTERS[col_indx]
 
 
 def letter_to_column_index(letter: Column) -> ColumnIndex:
-    return "abcdefgh".index(letter)
+    if (col_indx := _COLUMN_INDEX_FOR_LETTER.get(letter)) is None:
+        raise ValueError(f"Column must be a letter from a to h, but got {letter!r}")
+    return col_indx
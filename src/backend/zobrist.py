@@ -0,0 +1,15 @@
+import random
+
+# Random keys for Zobrist hashing, where a position's hash is the XOR of the keys for each of its parts.
+# NB: The generator is seeded so that the same position always hashes the same, even across runs.
+_random = random.Random(20240101)
+
+# PIECE_SQUARE_KEYS[piece_name][square] is the key for that piece being on that square.
+PIECE_SQUARE_KEYS: dict[str, tuple[int, ...]] = {
+    piece_name: tuple(_random.getrandbits(64) for _ in range(64)) for piece_name in "PNBRQKpnbrqk"
+}
+BLACK_TO_MOVE_KEY: int = _random.getrandbits(64)
+# Keyed by the FEN letter of the castling right.
+CASTLING_KEYS: dict[str, int] = {castling_right: _random.getrandbits(64) for castling_right in "KQkq"}
+# Indexed by the column index of the en passant target square.
+EN_PASSANT_KEYS: tuple[int, ...] = tuple(_random.getrandbits(64) for _ in range(8))
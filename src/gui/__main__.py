@@ -1,5 +1,6 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
 
 import pygame
 
@@ -8,7 +9,7 @@ from src.backend.game import Game
 from src.backend.move import Move
 from src.backend.piece import Piece
 from src.backend.utils import STARTING_BOARD_FEN  # noqa
-from src.typings import ColumnIndex, RowIndex
+from src.typings import Colour, ColumnIndex, PieceName, RowIndex
 
 SCREEN_WIDTH = 512
 SCREEN_HEIGHT = 512
@@ -17,8 +18,29 @@ SQUARE_SIDE_LENGTH = 64
 if SQUARE_SIDE_LENGTH * 8 > SCREEN_WIDTH or SQUARE_SIDE_LENGTH * 8 > SCREEN_HEIGHT:
     raise ValueError("SCREEN_WIDTH and SCREEN_HEIGHT must be greater than or equal to SQUARE_SIDE_LENGTH * 8")
 
-MOVE_HIGHLIGHT_COLOUR = "green"
-CHECK_HIGHLIGHT_COLOUR = "red"
+# NB: These are built once so pygame doesn't need to look up the colour names every time they're drawn.
+WHITE_SQUARE_COLOUR = pygame.Color("white")
+BLACK_SQUARE_COLOUR = pygame.Color("black")
+MOVE_HIGHLIGHT_COLOUR = pygame.Color("green")
+CHECK_HIGHLIGHT_COLOUR = pygame.Color("red")
+
+# Where each square is drawn on the screen, indexed by `row_indx * 8 + col_indx`. Row 0 (white's side) is at the bottom.
+SQUARE_RECTS: tuple[pygame.Rect, ...] = tuple(
+    pygame.Rect(
+        col_indx * SQUARE_SIDE_LENGTH, (7 - row_indx) * SQUARE_SIDE_LENGTH, SQUARE_SIDE_LENGTH, SQUARE_SIDE_LENGTH
+    )
+    for row_indx in range(8)
+    for col_indx in range(8)
+)
+# Highlights are drawn inset, so the square's own colour is left as a border around them.
+HIGHLIGHT_RECTS: tuple[pygame.Rect, ...] = tuple(square_rect.inflate(-8, -8) for square_rect in SQUARE_RECTS)
+# Where a piece image is blitted so that it's centered in each square.
+PIECE_POSITIONS: tuple[tuple[int, int], ...] = tuple(
+    (square_rect.x + SQUARE_SIDE_LENGTH // 4, square_rect.y + SQUARE_SIDE_LENGTH // 4) for square_rect in SQUARE_RECTS
+)
+
+# The scaled image of each piece, by (colour, name). NB: Filled by `load_piece_images` once the display is set up.
+PIECE_IMAGES: dict[tuple[Colour, PieceName], pygame.surface.Surface] = {}
 
 
 class HighlightType(Enum):
@@ -27,63 +49,72 @@ class HighlightType(Enum):
 
 
 class Highlight:
+    __slots__ = ("col_indx", "row_indx", "type")
+
     def __init__(self, col_indx: ColumnIndex, row_indx: RowIndex, type_: HighlightType) -> None:
         self.col_indx = col_indx
         self.row_indx = row_indx
         self.type = type_
 
-    def __eq__(self, other: Any) -> bool:
-        if isinstance(other, tuple):
-            return (self.col_indx, self.row_indx) == other
-        raise NotImplementedError(f"Cannot compare Highlight with type {type(other).__class__.__name__!r}")
-
-
-def display_board(screen: pygame.surface.Surface, board: Board, to_highlight: list[Highlight]) -> None:
-    for row_indx, row in enumerate(board.squares):
-        for col_indx, piece in enumerate(row):
-            square_colour = "white" if (row_indx + col_indx) % 2 == 0 else "black"
 
-            try:
-                highlight_indx = to_highlight.index((col_indx, row_indx))  #  type: ignore
-            except ValueError:
-                # No highlight for this square
-                has_highlight = False
-            else:
-                has_highlight = True
-                highlight = to_highlight[highlight_indx]
-                square_colour = (
-                    CHECK_HIGHLIGHT_COLOUR if highlight.type == HighlightType.CHECK else MOVE_HIGHLIGHT_COLOUR
-                )
-
-            pygame.draw.rect(
-                screen,
-                square_colour,
-                (
-                    col_indx * SQUARE_SIDE_LENGTH + 4 * has_highlight,
-                    (7 - row_indx) * SQUARE_SIDE_LENGTH + 4 * has_highlight,
-                    SQUARE_SIDE_LENGTH - 8 * has_highlight,
-                    SQUARE_SIDE_LENGTH - 8 * has_highlight,
-                ),
-            )
-
-            if piece is not None:
-                piece_name = piece.name
-                piece_colour = piece.colour
-                piece_image = pygame.image.load(f"src/gui/assets/{piece_colour}/{piece_name}.png")
-                if (piece_image.get_width(), piece_image.get_height()) != (
-                    SQUARE_SIDE_LENGTH / 2,
-                    SQUARE_SIDE_LENGTH / 2,
-                ):
-                    piece_image = pygame.transform.scale(
-                        piece_image, (SQUARE_SIDE_LENGTH // 2, SQUARE_SIDE_LENGTH // 2)
-                    )
-                screen.blit(
-                    piece_image,
-                    (  # Ensure image is centered in square
-                        (SQUARE_SIDE_LENGTH / 4) + col_indx * SQUARE_SIDE_LENGTH,
-                        (SQUARE_SIDE_LENGTH / 4) + (7 - row_indx) * SQUARE_SIDE_LENGTH,
-                    ),
-                )
+def load_piece_images() -> None:
+    # NB: `convert_alpha` needs the display mode to have been set.
+    for colour, piece_names in (("WHITE", "PNBRQK"), ("BLACK", "pnbrqk")):
+        for piece_name in piece_names:
+            piece_image = pygame.image.load(f"src/gui/assets/{colour}/{piece_name}.png").convert_alpha()
+            if (piece_image.get_width(), piece_image.get_height()) != (
+                SQUARE_SIDE_LENGTH / 2,
+                SQUARE_SIDE_LENGTH / 2,
+            ):
+                piece_image = pygame.transform.scale(piece_image, (SQUARE_SIDE_LENGTH // 2, SQUARE_SIDE_LENGTH // 2))
+            PIECE_IMAGES[(colour, piece_name)] = piece_image  # type: ignore
+
+
+def warm_up_sounds(*sounds: pygame.mixer.Sound) -> None:
+    # The first play of a sound waits on the mixer setting up a channel, so do that silently now rather than
+    # having the first move stutter.
+    for sound in sounds:
+        volume = sound.get_volume()
+        sound.set_volume(0)
+        sound.play()
+        sound.stop()
+        sound.set_volume(volume)
+
+
+def make_board_background() -> pygame.surface.Surface:
+    # The checkerboard never changes, so it's drawn once and then blitted in one go by `display_board`.
+    # NB: `convert` needs the display mode to have been set.
+    background = pygame.Surface((SQUARE_SIDE_LENGTH * 8, SQUARE_SIDE_LENGTH * 8)).convert()
+    for square, square_rect in enumerate(SQUARE_RECTS):
+        row_indx, col_indx = divmod(square, 8)
+        background.fill(WHITE_SQUARE_COLOUR if (row_indx + col_indx) % 2 == 0 else BLACK_SQUARE_COLOUR, square_rect)
+    return background
+
+
+def display_board(
+    screen: pygame.surface.Surface,
+    background: pygame.surface.Surface,
+    board: Board,
+    to_highlight: dict[tuple[ColumnIndex, RowIndex], Highlight],
+) -> pygame.Rect:
+    # Returns the area of the screen that was drawn on, i.e. what needs updating on the display.
+    board_rect = screen.blit(background, (0, 0))
+
+    for highlight in to_highlight.values():
+        pygame.draw.rect(
+            screen,
+            CHECK_HIGHLIGHT_COLOUR if highlight.type is HighlightType.CHECK else MOVE_HIGHLIGHT_COLOUR,
+            HIGHLIGHT_RECTS[highlight.row_indx * 8 + highlight.col_indx],
+        )
+
+    # NB: All of the pieces are blitted in one call, as that's much cheaper than a call per piece.
+    screen.fblits(
+        [
+            (PIECE_IMAGES[(piece.colour, piece.name)], PIECE_POSITIONS[piece.row_indx * 8 + piece.col_indx])
+            for piece in board.iter_pieces()
+        ]
+    )
+    return board_rect
 
 
 class Events:
@@ -95,6 +126,209 @@ class Events:
     PIECE_CAPTURED = pygame.event.custom_type()
 
 
+# Our events carry no attributes, so each is built once and then posted as many times as needed.
+TURN_STARTED_EVENT = pygame.event.Event(Events.TURN_STARTED)
+TURN_ENDED_EVENT = pygame.event.Event(Events.TURN_ENDED)
+CHECKED_EVENT = pygame.event.Event(Events.CHECKED)
+CHECKMATED_EVENT = pygame.event.Event(Events.CHECKMATED)
+GAME_OVER_EVENT = pygame.event.Event(Events.GAME_OVER)
+PIECE_CAPTURED_EVENT = pygame.event.Event(Events.PIECE_CAPTURED)
+
+
+@dataclass(slots=True)
+class GuiState:
+    # Everything the event handlers share, as each is only given this and the event.
+    game: Game
+    capture_sound: pygame.mixer.Sound
+    check_sound: pygame.mixer.Sound
+    game_over_sound: pygame.mixer.Sound
+    move_sound: pygame.mixer.Sound
+    pawn_promotion_sound: pygame.mixer.Sound
+    # The caption last set by `set_caption`.
+    caption: str = ""
+    # Whether anything shown has changed this iteration, so that the board is only redrawn when needed.
+    dirty: bool = False
+    first_piece_clicked: Piece | None = None
+    # The move of the first piece clicked to make when each square is clicked, by (col_indx, row_indx).
+    move_for_square: dict[tuple[ColumnIndex, RowIndex], Move] = field(default_factory=dict)
+    running: bool = True
+    # The highlight on each square, by (col_indx, row_indx).
+    to_highlight: dict[tuple[ColumnIndex, RowIndex], Highlight] = field(default_factory=dict)
+
+
+def set_caption(state: GuiState, caption: str) -> None:
+    # Setting the caption goes through to the window manager, so it's only done when the caption actually changes.
+    if caption != state.caption:
+        pygame.display.set_caption(caption)
+        state.caption = caption
+
+
+def on_quit(state: GuiState, event: pygame.event.Event) -> None:
+    state.running = False
+
+
+def on_window_exposed(state: GuiState, event: pygame.event.Event) -> None:
+    # The window was hidden and needs showing again, even though nothing has changed.
+    state.dirty = True
+
+
+def on_game_over(state: GuiState, event: pygame.event.Event) -> None:
+    state.game_over_sound.play()
+    print("\n".join(state.game.fens))
+
+
+def on_turn_started(state: GuiState, event: pygame.event.Event) -> None:
+    set_caption(state, f"Chess - {state.game.board.turn.capitalize()}'s turn")
+    state.dirty = True
+
+
+def on_checked_or_checkmated(state: GuiState, event: pygame.event.Event) -> None:
+    board = state.game.board
+    checked_or_checkmated_king = (board.white_pieces if board.turn == "WHITE" else board.black_pieces).king
+    checked_or_checkmated_king.can_castle = False
+    state.to_highlight = {
+        (checked_or_checkmated_king.col_indx, checked_or_checkmated_king.row_indx): Highlight(
+            checked_or_checkmated_king.col_indx,
+            checked_or_checkmated_king.row_indx,
+            HighlightType.CHECK,
+        )
+    }
+
+    if event.type == Events.CHECKMATED:
+        pygame.event.post(GAME_OVER_EVENT)
+    else:
+        state.check_sound.play()
+
+
+def on_piece_captured(state: GuiState, event: pygame.event.Event) -> None:
+    state.capture_sound.play()
+
+
+def on_turn_ended(state: GuiState, event: pygame.event.Event) -> None:
+    if state.game.over:
+        state.dirty = True
+        return
+
+    state.first_piece_clicked = None
+    state.move_for_square = {}
+
+    # Have finished ending current turn, so trigger next turn
+    pygame.event.post(TURN_STARTED_EVENT)
+
+
+def on_mouse_button_down(state: GuiState, event: pygame.event.Event) -> None:
+    game = state.game
+    if game.over:
+        return
+
+    col_indx: int = event.pos[0] // SQUARE_SIDE_LENGTH
+    row_indx: int = 7 - (
+        event.pos[1] // SQUARE_SIDE_LENGTH
+    )  # Substract from 7 so that bottom row (white) is row_indx 0, not 7
+
+    if (first_piece_clicked := state.first_piece_clicked) is not None:
+        if col_indx == first_piece_clicked.col_indx and row_indx == first_piece_clicked.row_indx:
+            # Clicked on the same piece, so ignore
+            return
+
+        if (move := state.move_for_square.get((col_indx, row_indx))) is not None:
+            try:
+                draw_reason = game.perform_move(move)
+            except Exception as e:
+                # Report the failed move and carry on, rather than closing the game.
+                print("Error", e, "\nBoard\n", game.board, "Prev Move", game.board.prev_move)
+                return
+
+            if not move.captures_piece or move.promotes_pawn:
+                state.move_sound.play()
+
+            if move.captures_piece:
+                pygame.event.post(PIECE_CAPTURED_EVENT)
+
+            if move.promotes_pawn:
+                state.capture_sound.stop()
+                state.pawn_promotion_sound.play()
+
+            state.to_highlight = {}
+            state.move_for_square = {}
+
+            if draw_reason is not None:
+                set_caption(state, f"Chess - Draw ({draw_reason.value})!")
+                pygame.event.post(GAME_OVER_EVENT)
+            elif move.checkmates_enemy:
+                winner = "white" if game.board.turn == "BLACK" else "black"
+                set_caption(state, f"Chess - {winner} wins!")
+                pygame.event.post(CHECKMATED_EVENT)
+            elif move.checks_enemy:
+                pygame.event.post(CHECKED_EVENT)
+
+            pygame.event.post(TURN_ENDED_EVENT)
+        else:
+            # Not a valid move, so reset move info
+            state.first_piece_clicked = None
+            # Remove move highlights
+            state.to_highlight = {
+                square: highlight
+                for square, highlight in state.to_highlight.items()
+                if highlight.type is not HighlightType.MOVE
+            }
+            state.move_for_square = {}
+
+            state.dirty = True
+
+    if (piece_at_square := game.board.flat_squares[row_indx * 8 + col_indx]) is not None:
+        if piece_at_square.colour != game.board.turn:
+            return
+
+        if state.first_piece_clicked is None:
+            state.first_piece_clicked = piece_at_square
+
+            to_highlight = state.to_highlight
+            move_for_square = state.move_for_square
+            for move in piece_at_square.generate_possible_moves(game.board):
+                if not (0 < len(move.components) < 3):
+                    raise ValueError(f"Expected move to have 1-2 components, but got {len(move.components)}: {move}")
+
+                if len(move.components) == 1:
+                    move_component = move.components[0]
+                    # NB: Only the first highlight of a square is kept.
+                    to_highlight.setdefault(
+                        (move_component.after.col_indx, move_component.after.row_indx),
+                        Highlight(move_component.after.col_indx, move_component.after.row_indx, HighlightType.MOVE),
+                    )
+                else:
+                    if move.components[0].before == piece_at_square:
+                        other_piece = move.components[1].before
+                    else:
+                        other_piece = move.components[0].before
+                    to_highlight.setdefault(
+                        (other_piece.col_indx, other_piece.row_indx),
+                        Highlight(other_piece.col_indx, other_piece.row_indx, HighlightType.MOVE),
+                    )
+                # NB: A move can be made by clicking any square it starts or ends at (other than the piece's own),
+                # since when castling you click the square of the piece you're castling with, not the square your
+                # piece moves to. If multiple moves share a square, the first is made.
+                for move_component in move.components:
+                    move_for_square.setdefault((move_component.after.col_indx, move_component.after.row_indx), move)
+                    move_for_square.setdefault((move_component.before.col_indx, move_component.before.row_indx), move)
+
+            state.dirty = True
+
+
+# The handler for each event type, so each event is dispatched with one lookup. Any other events are ignored.
+EVENT_HANDLERS: dict[int, Callable[[GuiState, pygame.event.Event], None]] = {
+    pygame.QUIT: on_quit,
+    pygame.WINDOWEXPOSED: on_window_exposed,
+    pygame.MOUSEBUTTONDOWN: on_mouse_button_down,
+    Events.GAME_OVER: on_game_over,
+    Events.TURN_STARTED: on_turn_started,
+    Events.CHECKED: on_checked_or_checkmated,
+    Events.CHECKMATED: on_checked_or_checkmated,
+    Events.PIECE_CAPTURED: on_piece_captured,
+    Events.TURN_ENDED: on_turn_ended,
+}
+
+
 def main() -> None:
     pygame.init()
 
@@ -103,9 +337,12 @@ def main() -> None:
     capture_sound = pygame.mixer.Sound("src/gui/assets/capture.wav")
     check_sound = pygame.mixer.Sound("src/gui/assets/check.wav")
     pawn_promotion_sound = pygame.mixer.Sound("src/gui/assets/promote.wav")
+    warm_up_sounds(game_over_sound, move_sound, capture_sound, check_sound, pawn_promotion_sound)
 
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Chess")
+    load_piece_images()
+    board_background = make_board_background()
 
     # game = Game(board_fen="3qkb2/3pp3/8/6Q1/8/8/8/4K3 b - - 0 1")  # Check or Checkmate
     # game = Game(board_fen="4k3/8/8/8/8/8/2q5/1K6 w - - 0 1")  # Insufficient material
@@ -117,159 +354,31 @@ def main() -> None:
     # game = Game()  # Random game
     game = Game(STARTING_BOARD_FEN)  # Normal game
 
-    pygame.event.post(pygame.event.Event(Events.TURN_STARTED))
+    # Only let events with a handler into the queue, so e.g. mouse motion doesn't need fetching just to be ignored.
+    # NB: This must be done before posting any of our own events, as posting a blocked event type does nothing.
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(EVENT_HANDLERS))
 
-    to_highlight: list[Highlight] = []
-    first_piece_clicked: Piece | None = None
-    moves_for_first_piece_clicked: list[Move] = []
+    pygame.event.post(TURN_STARTED_EVENT)
 
-    running: bool = True
-    while running:
-        try:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
+    state = GuiState(game, capture_sound, check_sound, game_over_sound, move_sound, pawn_promotion_sound)
+
+    clock = pygame.time.Clock()
+    while state.running:
+        state.dirty = False
+        for event in pygame.event.get():
+            if (handler := EVENT_HANDLERS.get(event.type)) is not None:
+                handler(state, event)
+                if not state.running:
                     break
 
-                if event.type == Events.GAME_OVER:
-                    game_over_sound.play()
-                    print("\n".join(game.fens))
-                    continue
-
-                if event.type == Events.TURN_STARTED:
-                    pygame.display.set_caption(f"Chess - {game.board.turn.capitalize()}'s turn")
-                    display_board(screen, game.board, to_highlight)
-
-                if event.type in {Events.CHECKMATED, Events.CHECKED}:
-                    checked_or_checkmated_king = (
-                        game.board.white_pieces if game.board.turn == "WHITE" else game.board.black_pieces
-                    ).king
-                    checked_or_checkmated_king.can_castle = False
-                    to_highlight = [
-                        Highlight(
-                            checked_or_checkmated_king.col_indx,
-                            checked_or_checkmated_king.row_indx,
-                            HighlightType.CHECK,
-                        )
-                    ]
-
-                    if event.type == Events.CHECKMATED:
-                        pygame.event.post(pygame.event.Event(Events.GAME_OVER))
-                    else:
-                        check_sound.play()
-                    continue
-
-                if event.type == Events.PIECE_CAPTURED:
-                    capture_sound.play()
-                    continue
-
-                if event.type == Events.TURN_ENDED:
-                    if game.over:
-                        display_board(screen, game.board, to_highlight)
-                        break
-
-                    first_piece_clicked = None
-                    moves_for_first_piece_clicked = []
-
-                    # Have finished ending current turn, so trigger next turn
-                    pygame.event.post(pygame.event.Event(Events.TURN_STARTED))
-                    continue
-
-                if not game.over and event.type == pygame.MOUSEBUTTONDOWN:
-                    col_indx: int = event.pos[0] // SQUARE_SIDE_LENGTH
-                    row_indx: int = 7 - (
-                        event.pos[1] // SQUARE_SIDE_LENGTH
-                    )  # Substract from 7 so that bottom row (white) is row_indx 0, not 7
-
-                    if first_piece_clicked is not None:
-                        if col_indx == first_piece_clicked.col_indx and row_indx == first_piece_clicked.row_indx:
-                            # Clicked on the same piece, so ignore
-                            continue
-                        for move in moves_for_first_piece_clicked:
-                            # NB: We check not only if the move ends at the clicked square but also
-                            # if it starts at the clicked square, since when castling you click the
-                            # square of the piece you're castling with, not the square your piece moves to.
-                            if move.ends_at(col_indx, row_indx) or move.starts_at(col_indx, row_indx):
-                                draw_reason = game.perform_move(move)
-
-                                if not move.captures_piece or move.promotes_pawn:
-                                    move_sound.play()
-
-                                if move.captures_piece:
-                                    pygame.event.post(pygame.event.Event(Events.PIECE_CAPTURED))
-
-                                if move.promotes_pawn:
-                                    capture_sound.stop()
-                                    pawn_promotion_sound.play()
-
-                                to_highlight = []
-                                moves_for_first_piece_clicked = []
-
-                                if draw_reason is not None:
-                                    pygame.display.set_caption(f"Chess - Draw ({draw_reason.value})!")
-                                    pygame.event.post(pygame.event.Event(Events.GAME_OVER))
-                                elif move.checkmates_enemy:
-                                    winner = "white" if game.board.turn == "BLACK" else "black"
-                                    pygame.display.set_caption(f"Chess - {winner} wins!")
-                                    pygame.event.post(pygame.event.Event(Events.CHECKMATED))
-                                elif move.checks_enemy:
-                                    pygame.event.post(pygame.event.Event(Events.CHECKED))
-
-                                pygame.event.post(pygame.event.Event(Events.TURN_ENDED))
-                                break
-                        else:
-                            # Not a valid move, so reset move info
-                            first_piece_clicked = None
-                            to_highlight = [
-                                *filter(
-                                    # Remove move highlights
-                                    lambda highlight: highlight.type != HighlightType.MOVE,
-                                    to_highlight,
-                                )
-                            ]
-                            moves_for_first_piece_clicked = []
-
-                            display_board(screen, game.board, to_highlight)
-
-                    if (piece_at_square := game.board.squares[row_indx][col_indx]) is not None:
-                        if piece_at_square.colour != game.board.turn:
-                            continue
-
-                        if first_piece_clicked is None:
-                            first_piece_clicked = piece_at_square
-
-                            for move in piece_at_square.generate_possible_moves(game.board):
-                                if not (0 < len(move.components) < 3):
-                                    raise ValueError(
-                                        f"Expected move to have 1-2 components, but got {len(move.components)}: {move}"
-                                    )
-
-                                if len(move.components) == 1:
-                                    move_component = move.components[0]
-                                    to_highlight.append(
-                                        Highlight(
-                                            move_component.after.col_indx,
-                                            move_component.after.row_indx,
-                                            HighlightType.MOVE,
-                                        )
-                                    )
-                                else:
-                                    if move.components[0].before == first_piece_clicked:
-                                        other_piece = move.components[1].before
-                                    else:
-                                        other_piece = move.components[0].before
-                                    to_highlight.append(
-                                        Highlight(other_piece.col_indx, other_piece.row_indx, HighlightType.MOVE)
-                                    )
-                                moves_for_first_piece_clicked.append(move)
-
-                            display_board(screen, game.board, to_highlight)
-
-            pygame.display.flip()
-        except Exception as e:
-            print("Error", e, "\nBoard\n", game.board, "Prev Move", game.board.prev_move)
-
-        if not running:
+        if state.dirty:
+            pygame.display.update(display_board(screen, board_background, game.board, state.to_highlight))
+
+        # Nothing needs doing between events, so don't spin faster than 60 iterations a second.
+        clock.tick(60)
+
+        if not state.running:
             pygame.quit()
 
 
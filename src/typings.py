@@ -5,47 +5,35 @@ if TYPE_CHECKING:
 
 BoardList = list[list["Piece | None"]]
 
-Colour = Literal["BLACK"] | Literal["WHITE"]
-PieceName = (
-    Literal["P"]  # White Pawn
-    | Literal["N"]  # White Knight
-    | Literal["B"]  # White Bishop
-    | Literal["R"]  # White Rook
-    | Literal["Q"]  # White Queen
-    | Literal["K"]  # White King
-    | Literal["p"]  # Black Pawn
-    | Literal["n"]  # Black Knight
-    | Literal["b"]  # Black Bishop
-    | Literal["r"]  # Black Rook
-    | Literal["q"]  # Black Queen
-    | Literal["k"]  # Black King
-)
-FenChar = (
-    PieceName
-    | Literal["1"]
-    | Literal["2"]
-    | Literal["3"]
-    | Literal["4"]
-    | Literal["5"]
-    | Literal["6"]
-    | Literal["7"]
-    | Literal["8"]
-)
+Colour = Literal["BLACK", "WHITE"]
+PieceName = Literal[
+    "P",  # White Pawn
+    "N",  # White Knight
+    "B",  # White Bishop
+    "R",  # White Rook
+    "Q",  # White Queen
+    "K",  # White King
+    "p",  # Black Pawn
+    "n",  # Black Knight
+    "b",  # Black Bishop
+    "r",  # Black Rook
+    "q",  # Black Queen
+    "k",  # Black King
+]
+# NB: Literals nested in a Literal are flattened into it.
+FenChar = Literal[PieceName, "1", "2", "3", "4", "5", "6", "7", "8"]
 
-Column = (
-    Literal["a"]
-    | Literal["b"]
-    | Literal["c"]
-    | Literal["d"]
-    | Literal["e"]
-    | Literal["f"]
-    | Literal["g"]
-    | Literal["h"]
-)
+Column = Literal["a", "b", "c", "d", "e", "f", "g", "h"]
 ColumnIndex = int
 Row = int  # 1-8
 RowIndex = int
 Position = str
+PositionKey = tuple[
+    str,  # piece placement
+    str,  # turn
+    str,  # castling rights
+    str,  # en passant target square
+]
 
 ChecksEnemy = bool
 CheckmatesEnemy = bool
@@ -1,11 +1,13 @@
 if __name__ == "__main__":
     from datetime import datetime
-    from tests import test_piece
+    from tests import test_game, test_piece
 
     test_categories = [
         test_piece.test_init,
         test_piece.test_properties,
         test_piece.test_move_generation,
+        test_game.test_repitition,
+        test_game.test_insufficient_material,
     ]
     start = datetime.now()
 
@@ -1 +1,40 @@
-# TODO: Implement tests for game.py
+from tests import perform_test
+
+from src.backend.game import DrawReason, Game
+from src.backend.utils import STARTING_BOARD_FEN
+
+
+def test_repitition() -> None:
+    game = Game(STARTING_BOARD_FEN)
+    draw_reasons: list[DrawReason | None] = []
+    for move_str in ["Nb1c3", "nb8c6", "Nc3b1", "nc6b8"] * 2:
+        move = next(move for move in game.board.generate_possible_moves() if move == move_str)
+        draw_reasons.append(game.perform_move(move))
+
+    perform_test(
+        "Draws by repitition on third occurence of starting position",
+        lambda x: x,
+        draw_reasons,
+        expected_response=[None] * 7 + [DrawReason.REPITITION],
+    )
+
+
+def test_insufficient_material() -> None:
+    insufficient_material_tests = [
+        ("Only the two kings left", "4k3/8/8/8/8/8/2q5/1K6 w - - 0 1", True),
+        ("King and knight against king", "4k3/8/8/8/8/8/2q5/1KN5 w - - 0 1", True),
+        ("King and minor piece each", "4kn2/8/8/8/8/8/2q5/1KN5 w - - 0 1", True),
+        ("King and two knights against king and knight", "4kn1n/8/8/8/8/8/2q5/1KN5 w - - 0 1", False),
+        ("King and rook against king", "4k3/8/8/8/8/8/2q5/1KR5 w - - 0 1", False),
+    ]
+
+    for test_name, board_fen, expected_draw in insufficient_material_tests:
+        game = Game(board_fen)
+        move = next(move for move in game.board.generate_possible_moves() if move == "Kb1xc2")
+
+        perform_test(
+            test_name,
+            lambda x: game.perform_move(x) == DrawReason.INSUFFICIENT_MATERIAL,
+            move,
+            expected_response=expected_draw,
+        )